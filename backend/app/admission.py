@@ -0,0 +1,204 @@
+"""Admission control for the expensive endpoints.
+
+Three independent guards keep a spike on balances or settlements from
+tying up every pooled connection and starving cheap writes:
+
+- Concurrency limits: each limited route serves at most N requests at a
+  time, with at most M more waiting, for up to ADMISSION_MAX_WAIT
+  seconds. Anything beyond that is turned away at once with
+  503 + Retry-After rather than queueing for a connection. Limits are
+  "route=concurrency:queue" pairs in ADMISSION_LIMITS, e.g.
+  ``settlements=4:16,balances=8:32``; 0 concurrency disables a limit.
+  The slot is taken before the request touches the database.
+- Single-flight: identical computations running at the same time (the
+  same group, ledger version and kind) share one run; see `single_flight`.
+- Rate limits: with RATE_LIMIT_PER_SECOND set, each client (by address)
+  gets a token bucket of RATE_LIMIT_BURST requests refilled at that rate
+  across the API, and is answered 429 + Retry-After when it runs dry.
+
+All state is per process; with several workers each enforces its own.
+"""
+import asyncio
+import math
+import os
+import time
+from typing import Awaitable, Callable, Dict, Tuple
+
+from fastapi import HTTPException, Request
+
+from .metrics import REQUESTS_SHED
+
+DEFAULT_LIMITS = "balances=8:32,settlements=4:16,dashboard=8:32,export=2:4"
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "2"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "0"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "20"))
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """Parse "route=concurrency:queue,..." into {route: (concurrency, queue)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = item.partition("=")
+        concurrency, _, queue = values.partition(":")
+        limits[name.strip()] = (int(concurrency), int(queue or 0))
+    return limits
+
+class ConcurrencyLimit:
+    """A semaphore with a bounded number of waiters"""
+    
+    def __init__(self, name: str, concurrency: int, queue: int):
+        self.name = name
+        self.queue = queue
+        self.slots = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+    
+    def reject(self, reason: str):
+        REQUESTS_SHED.labels(self.name, reason).inc()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Too many concurrent {self.name} requests; retry shortly",
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)}
+        )
+    
+    async def acquire(self):
+        if not self.slots.locked():
+            # A free slot; this doesn't block, so nothing can take it first
+            await self.slots.acquire()
+            return
+        if self.waiting >= self.queue:
+            self.reject("queue_full")
+        self.waiting += 1
+        # Not wait_for: before 3.12 its timeout can cancel the wait after the
+        # semaphore was granted, losing the slot for good. Here the acquire
+        # runs in this task, so the semaphore hands back a grant it couldn't
+        # deliver, and a slot we got is returned if we fail afterwards
+        acquired = False
+        try:
+            async with asyncio.timeout(ADMISSION_MAX_WAIT):
+                await self.slots.acquire()
+                acquired = True
+        except TimeoutError:
+            if not acquired:
+                self.reject("wait_timeout")
+        except BaseException:
+            if acquired:
+                self.slots.release()
+            raise
+        finally:
+            self.waiting -= 1
+    
+    def release(self):
+        self.slots.release()
+
+LIMITS = {
+    name: ConcurrencyLimit(name, concurrency, queue)
+    for name, (concurrency, queue) in {
+        **parse_limits(DEFAULT_LIMITS), **parse_limits(os.getenv("ADMISSION_LIMITS", ""))
+    }.items()
+    if concurrency > 0
+}
+
+def limit_concurrency(name: str):
+    """Dependency admitting a request to route `name`; put it in the decorator's
+    `dependencies` so the slot is held before any session is opened"""
+    limit = LIMITS.get(name)
+    
+    async def admit():
+        if limit is None:
+            yield
+            return
+        await limit.acquire()
+        try:
+            yield
+        finally:
+            limit.release()
+    
+    return admit
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one.
+    
+    The first caller runs the computation; callers arriving while it runs
+    wait for its result instead of starting their own. If the first caller
+    is cancelled (its client went away), a waiter takes over.
+    """
+    
+    def __init__(self):
+        self.calls: Dict[str, asyncio.Future] = {}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        while key in self.calls:
+            future = self.calls[key]
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self.calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn when there are none
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.calls[key]
+
+single_flight = SingleFlight()
+
+class TokenBuckets:
+    """Per-client token buckets: `burst` requests at once, refilled at `rate` per second"""
+    
+    # Buckets idle long enough to be full again are dropped past this many clients
+    MAX_CLIENTS = 10_000
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        # client -> (tokens, time of last update)
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+    
+    def take(self, client: str) -> float:
+        """Spend a token; return 0, or the seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self.buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self.buckets[client] = (tokens - 1, now)
+        if len(self.buckets) > self.MAX_CLIENTS:
+            self.prune(now)
+        return 0.0
+    
+    def prune(self, now: float):
+        full_after = self.burst / self.rate
+        self.buckets = {
+            client: bucket for client, bucket in self.buckets.items()
+            if now - bucket[1] < full_after
+        }
+
+rate_limits = TokenBuckets(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST) if RATE_LIMIT_PER_SECOND > 0 else None
+
+async def rate_limit(request: Request):
+    """Dependency charging the client one token per request"""
+    if rate_limits is None:
+        return
+    client = request.client.host if request.client else "unknown"
+    wait = rate_limits.take(client)
+    if wait:
+        REQUESTS_SHED.labels("rate_limit", "rate_limited").inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(wait))}
+        )
@@ -1,19 +1,32 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
 
-from ..database import get_db
-from ..schemas import APIResponse
-from ..crud import get_balances
+from ..admission import limit_concurrency
+from ..replicas import get_read_db
+from ..schemas import APIResponse, BalancesResponse
+from ..responses import api_response
+from ..crud import get_ledger_version
+from .caching import make_etag, etag_headers, not_modified, cached_balances
+from .dependencies import get_group_id
 
 router = APIRouter()
 
-@router.get("/balances", response_model=APIResponse)
-async def get_balances_endpoint(db: Session = Depends(get_db)):
+@router.get("/balances", response_model=APIResponse[BalancesResponse], dependencies=[Depends(limit_concurrency("balances"))])
+async def get_balances_endpoint(
+    request: Request,
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_read_db)
+):
     """Get current balances for all people"""
-    balances = get_balances(db)
+    version = await db.run_sync(get_ledger_version, group_id)
+    etag = make_etag(group_id, version, "balances")
+    cached_response = not_modified(request, etag)
+    if cached_response:
+        return cached_response
     
-    return APIResponse(
-        success=True,
-        data={"balances": [balance.dict() for balance in balances]},
-        message="Balances calculated successfully"
-    )
\ No newline at end of file
+    balances = await cached_balances(db, group_id, version)
+    
+    return api_response(
+        data={"balances": balances},
+        message="Balances calculated successfully",
+        headers=etag_headers(etag)
+    )
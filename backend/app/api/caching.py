@@ -0,0 +1,81 @@
+from typing import List, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from ..admission import single_flight
+from ..cache import cache, cache_key
+from ..crud import get_balance_cents, balance_dicts, settlement_dicts
+
+def make_etag(group_id: str, version: int, kind: str) -> str:
+    """Weak ETag for a representation derived from one ledger version"""
+    return f'W/"{group_id}-{version}-{kind}"'
+
+def etag_headers(etag: str) -> dict:
+    """Headers for a response validated by `etag`"""
+    # no-cache: clients may keep the body but must revalidate every time,
+    # which costs a 304 with no body while the ledger is unchanged
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds `etag`"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    # Weak comparison: W/"x" and "x" match
+    if "*" in candidates or etag in candidates or etag[2:] in candidates:
+        return Response(status_code=304, headers=etag_headers(etag))
+    return None
+
+BalanceCents = List[Tuple[str, int, int]]
+
+async def cached_balances(
+    db, group_id: str, version: int, balance_cents: Optional[BalanceCents] = None
+) -> List[dict]:
+    """Balances for `version` of the group's ledger, computed at most once per version.
+
+    Pass `balance_cents` when the caller has already read them for `version`.
+    """
+    key = cache_key(group_id, version, "balances")
+    balances = await cache.get(key)
+    if balances is not None:
+        return balances
+    
+    async def compute():
+        nonlocal balance_cents
+        if balance_cents is None:
+            balance_cents = await db.run_sync(get_balance_cents, group_id)
+        balances = balance_dicts(balance_cents)
+        await cache.set(key, balances)
+        return balances
+    
+    # Concurrent misses for the same version wait for one computation
+    return await single_flight.do(key, compute)
+
+async def cached_settlements(
+    db, group_id: str, version: int, mode: str = "greedy",
+    balance_cents: Optional[BalanceCents] = None
+) -> List[dict]:
+    """Settlements for `version` of the group's ledger, computed at most once per version.
+
+    Pass `balance_cents` when the caller has already read them for `version`.
+    """
+    key = cache_key(group_id, version, f"settlements:{mode}")
+    settlements = await cache.get(key)
+    if settlements is not None:
+        return settlements
+    
+    async def compute():
+        nonlocal balance_cents
+        if balance_cents is None:
+            balance_cents = await db.run_sync(get_balance_cents, group_id)
+        if mode == "greedy":
+            settlements = settlement_dicts(balance_cents, mode)
+        else:
+            # The exact solver can take up to its time budget; keep it off the event loop
+            settlements = await run_in_threadpool(settlement_dicts, balance_cents, mode)
+        await cache.set(key, settlements)
+        return settlements
+    
+    return await single_flight.do(key, compute)
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Optional
+
+from ..admission import limit_concurrency
+from ..models import DEFAULT_GROUP_ID
+from ..replicas import open_read_session
+from ..schemas import APIResponse, DashboardResponse
+from ..responses import api_response
+from ..crud import get_dashboard, get_dashboard_version
+from .caching import make_etag, etag_headers, not_modified, cached_balances, cached_settlements
+from .expenses import expense_to_dict
+
+router = APIRouter()
+
+@router.get("/dashboard", response_model=APIResponse[DashboardResponse], dependencies=[Depends(limit_concurrency("dashboard"))])
+async def get_dashboard_endpoint(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    group_id: str = DEFAULT_GROUP_ID
+):
+    """Get an expense page, balances and settlements in one round trip.
+
+    Everything, from the group check and the ETag's version onwards, is
+    read in a single snapshot transaction on one connection (and one
+    replica), so the parts always agree; balances and settlements share
+    one read of the ledger.
+    """
+    etag_kind = f"dashboard-{limit}-{cursor or ''}"
+    # Not get_group_id/get_read_db: the snapshot must begin with the
+    # session's first statement, and a second session would hold a second
+    # connection
+    async with open_read_session(request) as snapshot:
+        version = await snapshot.run_sync(get_dashboard_version, group_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Group not found")
+        # An unchanged dashboard costs the version lookup only
+        cached_response = not_modified(request, make_etag(group_id, version, etag_kind))
+        if cached_response:
+            return cached_response
+        
+        try:
+            expenses, next_cursor, balance_cents = await snapshot.run_sync(
+                get_dashboard, group_id, cursor, limit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        balances = await cached_balances(snapshot, group_id, version, balance_cents)
+        settlements = await cached_settlements(snapshot, group_id, version, "greedy", balance_cents)
+    
+    expenses_list = [expense_to_dict(expense) for expense in expenses]
+    
+    return api_response(
+        success=True,
+        data={
+            "version": version,
+            "expenses": expenses_list,
+            "count": len(expenses_list),
+            "next_cursor": next_cursor,
+            "balances": balances,
+            "settlements": settlements
+        },
+        message="Dashboard retrieved successfully",
+        headers=etag_headers(make_etag(group_id, version, etag_kind))
+    )
@@ -0,0 +1,33 @@
+from fastapi import Depends, HTTPException
+
+from ..database import open_session
+from ..replicas import get_read_db
+from ..models import DEFAULT_GROUP_ID
+from ..crud import get_group
+
+async def get_group_id(
+    group_id: str = DEFAULT_GROUP_ID,
+    db = Depends(get_read_db)
+) -> str:
+    """Resolve the group a request is scoped to.
+
+    Under /api/groups/{group_id} this is the path parameter; the
+    un-prefixed /api routes fall back to the default group. Reads check
+    it on a replica when there is one; writes share the primary session.
+    """
+    if not await db.run_sync(get_group, group_id):
+        raise HTTPException(status_code=404, detail="Group not found")
+    return group_id
+
+async def get_streaming_group_id(group_id: str = DEFAULT_GROUP_ID) -> str:
+    """get_group_id for streaming responses.
+
+    Yield dependencies are only torn down once a StreamingResponse ends, so
+    get_group_id's session would hold a pooled connection for the whole
+    stream; this one checks the group in its own session and closes it
+    before the response starts.
+    """
+    async with open_session() as db:
+        if not await db.run_sync(get_group, group_id):
+            raise HTTPException(status_code=404, detail="Group not found")
+    return group_id
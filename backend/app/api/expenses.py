@@ -1,105 +1,227 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import datetime
 
-from ..database import get_db
+from ..admission import limit_concurrency
+from ..database import get_async_db
+from ..replicas import get_read_db
+from ..money import MAX_AMOUNT, from_cents
+from ..bulk import detect_format, iter_batches
+from ..export import FORMATS, make_encoder, stream_export
 from ..schemas import (
-    ExpenseCreate, ExpenseUpdate, ExpenseResponse, 
-    APIResponse, ExpensesResponse, PeopleResponse
+    ExpenseCreate, ExpenseUpdate, ExpenseFilter, ExpenseResponse, 
+    APIResponse, ExpensesResponse, PeopleResponse, ImportResponse
 )
+from ..responses import api_response
 from ..crud import (
-    get_expense, get_expenses, create_expense, 
-    update_expense, delete_expense, get_all_people
+    get_expense, get_expenses, get_expenses_page, create_expense, import_expenses,
+    update_expense, delete_expense, get_all_people, get_ledger_version
 )
+from ..group_commit import GROUP_COMMIT, writer
+from .caching import make_etag, etag_headers, not_modified
+from .dependencies import get_group_id, get_streaming_group_id
+from .stream import broadcaster
 
 router = APIRouter()
 
-@router.post("/expenses", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
-async def add_expense(expense: ExpenseCreate, db: Session = Depends(get_db)):
+def expense_to_dict(expense) -> dict:
+    """Plain ExpenseResponse-shaped dict; ids and datetimes are left for the JSON encoder"""
+    return {
+        "id": expense.id,
+        "amount": from_cents(expense.amount_cents),
+        "description": expense.description,
+        "paid_by": expense.paid_by,
+        "split_type": expense.split_type,
+        "shares": [
+            {"person": share.person, "amount": from_cents(share.amount_cents)}
+            for share in expense.shares
+        ],
+        "created_at": expense.created_at,
+        "updated_at": expense.updated_at
+    }
+
+@router.post("/expenses", response_model=APIResponse[ExpenseResponse], status_code=status.HTTP_201_CREATED)
+async def add_expense(
+    expense: ExpenseCreate,
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_async_db)
+):
     """Add a new expense"""
     try:
-        db_expense = create_expense(db, expense)
-        return APIResponse(
+        if GROUP_COMMIT:
+            # Hand back the connection the group lookup checked out: the
+            # writer needs one to commit, and a burst of waiting requests
+            # must not hold the whole pool while it waits
+            await db.run_sync(lambda session: session.close())
+            db_expense = await writer.submit(group_id, expense)
+        else:
+            db_expense = await db.run_sync(create_expense, group_id, expense)
+        expense_data = expense_to_dict(db_expense)
+        broadcaster.publish_change(group_id, {"op": "created", "expense": expense_data})
+        return api_response(
             success=True,
-            data={
-                "id": db_expense.id,
-                "amount": db_expense.amount,
-                "description": db_expense.description,
-                "paid_by": db_expense.paid_by,
-                "created_at": db_expense.created_at.isoformat(),
-                "updated_at": db_expense.updated_at.isoformat()
-            },
-            message="Expense added successfully"
+            data=expense_data,
+            message="Expense added successfully",
+            status_code=status.HTTP_201_CREATED
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.get("/expenses", response_model=APIResponse)
-async def get_all_expenses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all expenses"""
-    expenses = get_expenses(db, skip=skip, limit=limit)
+# Cap on the per-row errors echoed back; the total is always reported
+MAX_REPORTED_ERRORS = 1000
+
+@router.post("/expenses/bulk", response_model=APIResponse[ImportResponse])
+async def bulk_import_expenses(
+    request: Request,
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_async_db)
+):
+    """Import expenses from a streamed CSV (text/csv) or NDJSON (application/x-ndjson) body.
+
+    Valid rows are inserted in batches; invalid rows are reported by line
+    number and skipped without aborting the import.
+    """
+    fmt = detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Content-Type must be text/csv or application/x-ndjson"
+        )
+    
+    inserted = 0
+    failed = 0
+    errors = []
+    try:
+        async for rows, batch_errors in iter_batches(request.stream(), fmt):
+            batch_inserted, insert_errors = await db.run_sync(import_expenses, group_id, rows)
+            inserted += batch_inserted
+            batch_errors = sorted(batch_errors + insert_errors, key=lambda error: error["line"])
+            failed += len(batch_errors)
+            errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 encoded")
+    finally:
+        if inserted:
+            # Too many rows for a delta; subscribers reload the expense list
+            broadcaster.publish_change(group_id)
+    
+    return api_response(
+        success=failed == 0,
+        data={"inserted": inserted, "failed": failed, "errors": errors},
+        message=f"Imported {inserted} expenses, {failed} rows rejected"
+    )
+
+@router.get(
+    "/expenses/export", response_class=StreamingResponse,
+    dependencies=[Depends(limit_concurrency("export"))]
+)
+async def export_expenses(
+    format: str = Query("ndjson", pattern="^(csv|ndjson|parquet)$"),
+    group_id: str = Depends(get_streaming_group_id)
+):
+    """Stream every expense in the group as CSV, NDJSON or Parquet.
+
+    NDJSON exports end with the group's balances and settlements, read in
+    the same snapshot as the expenses.
+    """
+    try:
+        encoder = make_encoder(format)
+    except ImportError:
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
     
-    expenses_list = []
-    for expense in expenses:
-        expenses_list.append({
-            "id": expense.id,
-            "amount": expense.amount,
-            "description": expense.description,
-            "paid_by": expense.paid_by,
-            "created_at": expense.created_at.isoformat(),
-            "updated_at": expense.updated_at.isoformat()
-        })
+    return StreamingResponse(
+        stream_export(group_id, encoder),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="expenses-{group_id}.{format}"'}
+    )
+
+@router.get("/expenses", response_model=APIResponse[ExpensesResponse])
+async def get_all_expenses(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Use `cursor` instead"),
+    since: Optional[datetime] = Query(None, description="Created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Created before this time"),
+    paid_by: Optional[str] = Query(None),
+    min_amount: Optional[float] = Query(None, ge=0, le=MAX_AMOUNT, allow_inf_nan=False),
+    max_amount: Optional[float] = Query(None, ge=0, le=MAX_AMOUNT, allow_inf_nan=False),
+    q: Optional[str] = Query(None, max_length=200, description="Words that must all appear in the description"),
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_read_db)
+):
+    """Get expenses, newest first, one page at a time.
+
+    Keep the same filters while following `next_cursor`.
+    """
+    # Every expense write bumps the ledger version, so it identifies the page
+    # contents. Read it before the page: a write in between makes the ETag
+    # older than the body, which costs a refetch but never serves stale data
+    version = await db.run_sync(get_ledger_version, group_id)
+    etag = make_etag(group_id, version, f"expenses-{request.url.query}")
+    cached_response = not_modified(request, etag)
+    if cached_response:
+        return cached_response
     
-    return APIResponse(
+    filters = ExpenseFilter(
+        since=since, until=until, paid_by=paid_by, min_amount=min_amount, max_amount=max_amount, q=q
+    )
+    if skip is not None:
+        expenses = await db.run_sync(get_expenses, group_id, skip=skip, limit=limit, filters=filters)
+        next_cursor = None
+    else:
+        try:
+            expenses, next_cursor = await db.run_sync(get_expenses_page, group_id, cursor, limit, filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    expenses_list = [expense_to_dict(expense) for expense in expenses]
+    
+    return api_response(
         success=True,
-        data={"expenses": expenses_list, "count": len(expenses_list)},
-        message="Expenses retrieved successfully"
+        data={"expenses": expenses_list, "count": len(expenses_list), "next_cursor": next_cursor},
+        message="Expenses retrieved successfully",
+        headers=etag_headers(etag)
     )
 
-@router.get("/expenses/{expense_id}", response_model=APIResponse)
-async def get_expense_by_id(expense_id: str, db: Session = Depends(get_db)):
+@router.get("/expenses/{expense_id}", response_model=APIResponse[ExpenseResponse])
+async def get_expense_by_id(
+    expense_id: str,
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_read_db)
+):
     """Get expense by ID"""
-    expense = get_expense(db, expense_id)
+    expense = await db.run_sync(get_expense, group_id, expense_id)
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
     
-    return APIResponse(
+    return api_response(
         success=True,
-        data={
-            "id": expense.id,
-            "amount": expense.amount,
-            "description": expense.description,
-            "paid_by": expense.paid_by,
-            "created_at": expense.created_at.isoformat(),
-            "updated_at": expense.updated_at.isoformat()
-        },
+        data=expense_to_dict(expense),
         message="Expense retrieved successfully"
     )
 
-@router.put("/expenses/{expense_id}", response_model=APIResponse)
+@router.put("/expenses/{expense_id}", response_model=APIResponse[ExpenseResponse])
 async def update_expense_by_id(
     expense_id: str, 
     expense_update: ExpenseUpdate, 
-    db: Session = Depends(get_db)
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_async_db)
 ):
     """Update expense by ID"""
     try:
-        db_expense = update_expense(db, expense_id, expense_update)
+        db_expense = await db.run_sync(update_expense, group_id, expense_id, expense_update)
         if not db_expense:
             raise HTTPException(status_code=404, detail="Expense not found")
         
-        return APIResponse(
+        expense_data = expense_to_dict(db_expense)
+        broadcaster.publish_change(group_id, {"op": "updated", "expense": expense_data})
+        return api_response(
             success=True,
-            data={
-                "id": db_expense.id,
-                "amount": db_expense.amount,
-                "description": db_expense.description,
-                "paid_by": db_expense.paid_by,
-                "created_at": db_expense.created_at.isoformat(),
-                "updated_at": db_expense.updated_at.isoformat()
-            },
+            data=expense_data,
             message="Expense updated successfully"
         )
     except ValueError as e:
@@ -108,24 +230,40 @@ async def update_expense_by_id(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/expenses/{expense_id}", response_model=APIResponse)
-async def delete_expense_by_id(expense_id: str, db: Session = Depends(get_db)):
+async def delete_expense_by_id(
+    expense_id: str,
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_async_db)
+):
     """Delete expense by ID"""
-    success = delete_expense(db, expense_id)
+    success = await db.run_sync(delete_expense, group_id, expense_id)
     if not success:
         raise HTTPException(status_code=404, detail="Expense not found")
     
-    return APIResponse(
+    broadcaster.publish_change(group_id, {"op": "deleted", "expense": {"id": expense_id}})
+    return api_response(
         success=True,
         message="Expense deleted successfully"
     )
 
-@router.get("/people", response_model=APIResponse)
-async def get_people(db: Session = Depends(get_db)):
+@router.get("/people", response_model=APIResponse[PeopleResponse])
+async def get_people(
+    request: Request,
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_read_db)
+):
     """Get all people"""
-    people = get_all_people(db)
+    version = await db.run_sync(get_ledger_version, group_id)
+    etag = make_etag(group_id, version, "people")
+    cached_response = not_modified(request, etag)
+    if cached_response:
+        return cached_response
+    
+    people = await db.run_sync(get_all_people, group_id)
     
-    return APIResponse(
+    return api_response(
         success=True,
         data={"people": people, "count": len(people)},
-        message="People retrieved successfully"
+        message="People retrieved successfully",
+        headers=etag_headers(etag)
     )
\ No newline at end of file
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ..database import get_async_db
+from ..schemas import GroupCreate, GroupResponse, APIResponse
+from ..crud import get_group, get_groups, create_group
+
+router = APIRouter()
+
+@router.post("/groups", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
+async def add_group(group: GroupCreate, db = Depends(get_async_db)):
+    """Create a new group"""
+    db_group = await db.run_sync(create_group, group)
+    return APIResponse(
+        success=True,
+        data=GroupResponse.model_validate(db_group).model_dump(mode="json"),
+        message="Group created successfully"
+    )
+
+@router.get("/groups", response_model=APIResponse)
+async def get_all_groups(
+    skip: int = 0,
+    limit: int = 100,
+    db = Depends(get_async_db)
+):
+    """Get all groups"""
+    groups = await db.run_sync(get_groups, skip=skip, limit=limit)
+    groups_list = [GroupResponse.model_validate(group).model_dump(mode="json") for group in groups]
+    
+    return APIResponse(
+        success=True,
+        data={"groups": groups_list, "count": len(groups_list)},
+        message="Groups retrieved successfully"
+    )
+
+@router.get("/groups/{group_id}", response_model=APIResponse)
+async def get_group_by_id(group_id: str, db = Depends(get_async_db)):
+    """Get group by ID"""
+    group = await db.run_sync(get_group, group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
+    return APIResponse(
+        success=True,
+        data=GroupResponse.model_validate(group).model_dump(mode="json"),
+        message="Group retrieved successfully"
+    )
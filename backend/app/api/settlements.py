@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
 
-from ..database import get_db
-from ..schemas import APIResponse
-from ..crud import calculate_settlements
+from ..admission import limit_concurrency
+from ..replicas import get_read_db
+from ..schemas import APIResponse, SettlementsResponse
+from ..responses import api_response
+from ..crud import get_ledger_version
+from .caching import make_etag, etag_headers, not_modified, cached_settlements
+from .dependencies import get_group_id
 
 router = APIRouter()
 
-@router.get("/settlements", response_model=APIResponse)
-async def get_settlements(db: Session = Depends(get_db)):
+@router.get("/settlements", response_model=APIResponse[SettlementsResponse], dependencies=[Depends(limit_concurrency("settlements"))])
+async def get_settlements(
+    request: Request,
+    mode: str = Query("greedy", pattern="^(greedy|optimal)$", description="Settlement solver"),
+    group_id: str = Depends(get_group_id),
+    db = Depends(get_read_db)
+):
     """Get optimized settlement transactions"""
-    settlements = calculate_settlements(db)
+    version = await db.run_sync(get_ledger_version, group_id)
+    etag = make_etag(group_id, version, f"settlements-{mode}")
+    cached_response = not_modified(request, etag)
+    if cached_response:
+        return cached_response
     
-    return APIResponse(
-        success=True,
-        data={"settlements": [settlement.dict() for settlement in settlements]},
-        message="Settlements calculated successfully"
-    )
\ No newline at end of file
+    settlements = await cached_settlements(db, group_id, version, mode)
+    
+    return api_response(
+        data={"settlements": settlements},
+        message="Settlements calculated successfully",
+        headers=etag_headers(etag)
+    )
@@ -0,0 +1,137 @@
+"""Server-Sent Events feed of ledger changes.
+
+Dashboards subscribe to GET /api/stream instead of polling expenses,
+balances and settlements. Whenever a group's ledger version moves, the
+balances and settlements are computed once (through the version-keyed
+cache) and the same event is fanned out to every subscriber of that
+group. Writes handled by this worker push immediately along with the
+expense delta; writes made by other workers are picked up by a cheap
+per-group version check every STREAM_POLL_SECONDS.
+"""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from ..database import open_session
+from ..responses import dumps
+from ..crud import get_ledger_version
+from .caching import cached_balances, cached_settlements
+from .dependencies import get_streaming_group_id
+
+logger = logging.getLogger(__name__)
+
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "2"))
+KEEPALIVE_SECONDS = 15
+# Events buffered per subscriber; a slow client loses the oldest ones,
+# which is harmless because every event carries the full balances
+SUBSCRIBER_QUEUE_SIZE = 16
+
+router = APIRouter()
+
+async def load_snapshot(group_id: str) -> dict:
+    async with open_session() as db:
+        version = await db.run_sync(get_ledger_version, group_id)
+        return {
+            "version": version,
+            "balances": await cached_balances(db, group_id, version),
+            "settlements": await cached_settlements(db, group_id, version)
+        }
+
+class Broadcaster:
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.versions = {}
+        self.locks = defaultdict(asyncio.Lock)
+        self.pollers = {}
+        self.tasks = set()
+    
+    def subscribe(self, group_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers[group_id].add(queue)
+        if group_id not in self.pollers:
+            self.pollers[group_id] = asyncio.create_task(self._poll(group_id))
+        return queue
+    
+    def unsubscribe(self, group_id: str, queue: asyncio.Queue):
+        self.subscribers[group_id].discard(queue)
+        if not self.subscribers[group_id]:
+            del self.subscribers[group_id]
+            self.versions.pop(group_id, None)
+            poller = self.pollers.pop(group_id, None)
+            if poller:
+                poller.cancel()
+    
+    def publish_change(self, group_id: str, delta: Optional[dict] = None):
+        """Schedule a push for a write that just committed; returns immediately"""
+        if group_id not in self.subscribers:
+            return
+        task = asyncio.create_task(self._broadcast(group_id, delta))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+    
+    async def _broadcast(self, group_id: str, delta: Optional[dict] = None):
+        async with self.locks[group_id]:
+            try:
+                snapshot = await load_snapshot(group_id)
+            except Exception:
+                logger.exception("Failed to load ledger snapshot for group %s", group_id)
+                return
+            if delta is None and snapshot["version"] == self.versions.get(group_id):
+                return
+            self.versions[group_id] = snapshot["version"]
+            event = {**snapshot, "delta": delta}
+            for queue in self.subscribers.get(group_id, ()):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(event)
+    
+    async def _poll(self, group_id: str):
+        while True:
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+            try:
+                async with open_session() as db:
+                    version = await db.run_sync(get_ledger_version, group_id)
+            except Exception:
+                logger.exception("Ledger version check failed for group %s", group_id)
+                continue
+            if version != self.versions.get(group_id):
+                await self._broadcast(group_id)
+
+broadcaster = Broadcaster()
+
+def format_event(event: dict) -> str:
+    return f"event: ledger\nid: {event['version']}\ndata: {dumps(event).decode()}\n\n"
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_ledger(request: Request, group_id: str = Depends(get_streaming_group_id)):
+    """Push balances and settlements (plus the expense delta) whenever the ledger changes.
+
+    A subscriber holds no database connection between events: the group
+    check and each snapshot use short-lived sessions.
+    """
+    async def events():
+        queue = broadcaster.subscribe(group_id)
+        try:
+            snapshot = await load_snapshot(group_id)
+            broadcaster.versions.setdefault(group_id, snapshot["version"])
+            yield format_event({**snapshot, "delta": None})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            broadcaster.unsubscribe(group_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,110 @@
+"""Streaming parsers for bulk expense import.
+
+The request body is consumed chunk by chunk, so a large CSV or NDJSON
+upload is never held in memory as a whole. Rows are validated with the
+same `ExpenseCreate` rules as single inserts and handed out in batches.
+"""
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .schemas import ExpenseCreate
+
+# Rows per INSERT statement / transaction
+BATCH_SIZE = 5000
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """Map a Content-Type header to "csv" / "ndjson", or None if unsupported"""
+    if not content_type:
+        return None
+    return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Re-assemble a byte stream into text lines"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8").rstrip("\r")
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line number, dict) per record, or (line number, error message).
+
+    CSV input needs a header row naming amount, description and paid_by;
+    quoted fields may not span lines. Optional split_type and shares
+    columns take the form exports write: shares as a JSON array, both
+    empty for an unsplit expense.
+    """
+    header = None
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, "Expected a JSON object"
+                continue
+            yield line_no, record
+        else:
+            row = next(csv.reader([line]))
+            if header is None:
+                header = [column.strip() for column in row]
+                continue
+            if len(row) != len(header):
+                yield line_no, f"Expected {len(header)} columns, got {len(row)}"
+                continue
+            record = dict(zip(header, row))
+            if not record.get("split_type"):
+                record.pop("split_type", None)
+            if record.get("shares"):
+                try:
+                    record["shares"] = json.loads(record["shares"])
+                except ValueError as e:
+                    yield line_no, f"Invalid JSON in shares: {e}"
+                    continue
+            else:
+                record.pop("shares", None)
+            yield line_no, record
+
+async def iter_batches(
+    chunks: AsyncIterator[bytes], fmt: str, batch_size: int = BATCH_SIZE
+) -> AsyncIterator[Tuple[List[Tuple[int, ExpenseCreate]], List[dict]]]:
+    """Yield ((line number, valid expense) pairs, row errors) for each batch of parsed rows"""
+    expenses = []
+    errors = []
+    async for line_no, record in iter_records(chunks, fmt):
+        if isinstance(record, str):
+            errors.append({"line": line_no, "error": record})
+        else:
+            try:
+                expenses.append((line_no, ExpenseCreate(**record)))
+            except ValidationError as e:
+                messages = [
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+                    for err in e.errors()
+                ]
+                errors.append({"line": line_no, "error": "; ".join(messages)})
+        if len(expenses) >= batch_size:
+            yield expenses, errors
+            expenses, errors = [], []
+    if expenses or errors:
+        yield expenses, errors
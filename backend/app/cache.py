@@ -0,0 +1,71 @@
+"""Caches for derived per-group data (balances, settlements).
+
+Entries are keyed by the group's ledger version, which every expense
+write bumps, so a cached value never needs explicit invalidation: a
+write simply makes readers look up a new key, and stale entries age out.
+
+The backend is picked from CACHE_URL:
+
+- unset / "memory": an in-process LRU bounded to CACHE_MAX_ENTRIES
+- redis://...: a shared Redis (needs the optional `redis` package);
+  entries expire after CACHE_TTL_SECONDS and Redis' own maxmemory
+  policy bounds the total size
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+CACHE_URL = os.getenv("CACHE_URL", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+
+def cache_key(group_id: str, version: int, kind: str) -> str:
+    return f"splitapp:{group_id}:{version}:{kind}"
+
+class LRUCache:
+    """Bounded in-process cache; least recently used entries are evicted first"""
+    
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    async def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class RedisCache:
+    """Cache shared by every worker through Redis; values are stored as JSON"""
+    
+    def __init__(self, url: str, ttl: int = CACHE_TTL_SECONDS):
+        # Optional dependency: only needed when CACHE_URL points at Redis
+        import redis.asyncio as redis
+        
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+    
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.client.get(key)
+        return json.loads(value) if value is not None else None
+    
+    async def set(self, key: str, value: Any):
+        await self.client.set(key, json.dumps(value), ex=self.ttl)
+
+def make_cache():
+    if CACHE_URL.startswith(("redis://", "rediss://")):
+        return RedisCache(CACHE_URL)
+    return LRUCache()
+
+cache = make_cache()
@@ -1,167 +1,645 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
-from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import desc, func, insert, update, delete, tuple_
+from sqlalchemy.exc import OperationalError, StatementError
+from typing import List, Optional, Tuple
 from collections import defaultdict
 import uuid
 
-from .models import Expense
-from .schemas import ExpenseCreate, ExpenseUpdate, Balance, Settlement
+from .database import begin_snapshot
+from .models import Group, Expense, ExpenseShare, PersonBalance, DEFAULT_GROUP_ID, utcnow, uuid7
+from .money import from_cents, split_evenly
+from .pagination import encode_cursor, decode_cursor
+from .search import description_matches
+from .settlement import SOLVERS
+from .splits import compute_shares
+from .schemas import GroupCreate, ExpenseCreate, ExpenseUpdate, ExpenseFilter, Balance, Settlement
 
-def get_expense(db: Session, expense_id: str) -> Optional[Expense]:
+def get_group(db: Session, group_id: str) -> Optional[Group]:
+    """Get group by ID"""
+    return db.get(Group, group_id)
+
+def get_groups(db: Session, skip: int = 0, limit: int = 100) -> List[Group]:
+    """Get all groups"""
+    return db.query(Group).order_by(Group.created_at, Group.id).offset(skip).limit(limit).all()
+
+def create_group(db: Session, group: GroupCreate) -> Group:
+    """Create new group"""
+    db_group = Group(id=str(uuid.uuid4()), name=group.name)
+    db.add(db_group)
+    db.commit()
+    db.refresh(db_group)
+    return db_group
+
+def get_ledger_version(db: Session, group_id: str) -> int:
+    """Get the group's ledger version, which changes whenever its expenses do"""
+    return db.query(Group.ledger_version).filter(Group.id == group_id).scalar()
+
+def bump_ledger_version(db: Session, group_id: str):
+    """Advance the group's ledger version in the current transaction"""
+    db.execute(
+        update(Group)
+        .where(Group.id == group_id)
+        .values(ledger_version=Group.ledger_version + 1)
+    )
+
+def ensure_default_group(db: Session) -> Group:
+    """Create the group behind the un-prefixed /api routes if it is missing"""
+    db_group = get_group(db, DEFAULT_GROUP_ID)
+    if not db_group:
+        db_group = Group(id=DEFAULT_GROUP_ID, name="Default")
+        db.add(db_group)
+        db.commit()
+    return db_group
+
+def parse_id(expense_id) -> Optional[uuid.UUID]:
+    """Parse an expense id from a URL; None if it cannot be one"""
+    try:
+        return uuid.UUID(str(expense_id))
+    except ValueError:
+        return None
+
+def get_expense(db: Session, group_id: str, expense_id: str) -> Optional[Expense]:
     """Get expense by ID"""
-    return db.query(Expense).filter(Expense.id == expense_id).first()
+    expense_id = parse_id(expense_id)
+    if expense_id is None:
+        return None
+    return db.query(Expense).filter(Expense.id == expense_id, Expense.group_id == group_id).first()
+
+def filter_expenses(db: Session, query, filters: Optional[ExpenseFilter]):
+    """Narrow an expense query to the rows matching `filters`.
+
+    Time ranges use idx_expenses_group_created_at, a payer (with or without
+    a range) idx_expenses_group_paid_by, amounts idx_expenses_group_amount
+    and description words the full-text index from search.py.
+    """
+    if filters is None:
+        return query
+    if filters.since is not None:
+        query = query.filter(Expense.created_at >= filters.since)
+    if filters.until is not None:
+        query = query.filter(Expense.created_at < filters.until)
+    if filters.paid_by is not None:
+        query = query.filter(Expense.paid_by == filters.paid_by)
+    if filters.min_amount_cents is not None:
+        query = query.filter(Expense.amount_cents >= filters.min_amount_cents)
+    if filters.max_amount_cents is not None:
+        query = query.filter(Expense.amount_cents <= filters.max_amount_cents)
+    if filters.q is not None:
+        query = query.filter(description_matches(db.get_bind().dialect.name, filters.q))
+    return query
+
+def get_expenses(
+    db: Session, group_id: str, skip: int = 0, limit: int = 100, filters: Optional[ExpenseFilter] = None
+) -> List[Expense]:
+    """Get all expenses (deprecated OFFSET paging; see get_expenses_page)"""
+    return (
+        filter_expenses(db, db.query(Expense).filter(Expense.group_id == group_id), filters)
+        .order_by(desc(Expense.created_at), desc(Expense.id))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+def get_expenses_page(
+    db: Session, group_id: str, cursor: Optional[str] = None, limit: int = 100,
+    filters: Optional[ExpenseFilter] = None
+) -> Tuple[List[Expense], Optional[str]]:
+    """Get one page of expenses, newest first, and the cursor for the next page.
+
+    Pages are keyset ranges over (created_at, id), served by
+    idx_expenses_group_created_at, so a deep page costs the same as the
+    first one and concurrent inserts never shift rows between pages.
+    Raises ValueError for a malformed cursor.
+    """
+    query = filter_expenses(db, db.query(Expense).filter(Expense.group_id == group_id), filters)
+    if cursor is not None:
+        created_at, expense_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Expense.created_at, Expense.id) < tuple_(created_at, expense_id))
+    
+    # Fetch one extra row to learn whether another page exists
+    expenses = query.order_by(desc(Expense.created_at), desc(Expense.id)).limit(limit + 1).all()
+    if len(expenses) <= limit:
+        return expenses, None
+    
+    expenses = expenses[:limit]
+    last = expenses[-1]
+    return expenses, encode_cursor(last.created_at, last.id)
+
+def make_shares(
+    group_id: str, amount_cents: int, split_type: Optional[str], participants: List[Tuple[str, Optional[float]]]
+) -> List[ExpenseShare]:
+    """Build the share rows for a split; an unsplit expense has none"""
+    if split_type is None:
+        return []
+    values = dict(participants)
+    return [
+        ExpenseShare(group_id=group_id, person=person, amount_cents=cents, value=values[person])
+        for person, cents in sorted(compute_shares(amount_cents, split_type, participants))
+    ]
+
+def add_ledger_deltas(deltas: dict, paid_by: str, amount_cents: int, shares, sign: int = 1):
+    """Accumulate one expense's effect on the ledger into `deltas`.
+
+    `deltas` maps person -> [paid cents, expense count, owed cents, share count];
+    `shares` are (person, cents owed) pairs.
+    """
+    deltas[paid_by][0] += sign * amount_cents
+    deltas[paid_by][1] += sign
+    for person, cents in shares:
+        deltas[person][2] += sign * cents
+        deltas[person][3] += sign
+
+def new_ledger_deltas() -> dict:
+    return defaultdict(lambda: [0, 0, 0, 0])
 
-def get_expenses(db: Session, skip: int = 0, limit: int = 100) -> List[Expense]:
-    """Get all expenses"""
-    return db.query(Expense).order_by(desc(Expense.created_at)).offset(skip).limit(limit).all()
+def apply_ledger_deltas(db: Session, group_id: str, deltas: dict):
+    """Apply accumulated deltas, one statement per person that changed"""
+    # Sorted so concurrent writers lock ledger rows in the same order
+    for person in sorted(deltas):
+        if any(deltas[person]):
+            apply_ledger_delta(db, group_id, person, *deltas[person])
 
-def create_expense(db: Session, expense: ExpenseCreate) -> Expense:
+def create_expense(db: Session, group_id: str, expense: ExpenseCreate) -> Expense:
     """Create new expense"""
-    expense_id = str(uuid.uuid4())
+    shares = make_shares(
+        group_id, expense.amount_cents, expense.split_type,
+        [(share.person, share.value) for share in expense.shares or []]
+    )
     db_expense = Expense(
-        id=expense_id,
-        amount=expense.amount,
+        id=uuid7(),
+        group_id=group_id,
+        amount_cents=expense.amount_cents,
         description=expense.description,
-        paid_by=expense.paid_by
+        paid_by=expense.paid_by,
+        split_type=expense.split_type,
+        shares=shares
     )
     db.add(db_expense)
+    deltas = new_ledger_deltas()
+    add_ledger_deltas(
+        deltas, db_expense.paid_by, db_expense.amount_cents,
+        [(share.person, share.amount_cents) for share in shares]
+    )
+    apply_ledger_deltas(db, group_id, deltas)
+    bump_ledger_version(db, group_id)
+    # id and timestamps are generated in-app, so there is nothing to re-read
     db.commit()
-    db.refresh(db_expense)
     return db_expense
 
-def update_expense(db: Session, expense_id: str, expense_update: ExpenseUpdate) -> Optional[Expense]:
-    """Update expense"""
-    db_expense = get_expense(db, expense_id)
+def expense_rows(group_id: str, expense: ExpenseCreate, now) -> Tuple[dict, List[dict]]:
+    """Insert parameters for one new expense and its share rows"""
+    expense_id = uuid7()
+    row = {
+        "id": expense_id,
+        "group_id": group_id,
+        "amount_cents": expense.amount_cents,
+        "description": expense.description,
+        "paid_by": expense.paid_by,
+        "split_type": expense.split_type,
+        "created_at": now,
+        "updated_at": now
+    }
+    values = {share.person: share.value for share in expense.shares or []}
+    share_rows = [
+        {
+            "expense_id": expense_id,
+            "group_id": group_id,
+            "person": person,
+            "amount_cents": cents,
+            "value": values[person]
+        }
+        for person, cents in expense.share_cents or []
+    ]
+    return row, share_rows
+
+def bulk_create_expenses(db: Session, group_id: str, expenses: List[ExpenseCreate]) -> int:
+    """Insert many expenses with one multi-row INSERT and commit once"""
+    if not expenses:
+        return 0
+    
+    now = utcnow()
+    rows = []
+    share_rows = []
+    deltas = new_ledger_deltas()
+    for expense in expenses:
+        row, expense_share_rows = expense_rows(group_id, expense, now)
+        rows.append(row)
+        share_rows.extend(expense_share_rows)
+        add_ledger_deltas(
+            deltas, expense.paid_by, row["amount_cents"],
+            [(share["person"], share["amount_cents"]) for share in expense_share_rows]
+        )
+    
+    db.execute(insert(Expense), rows)
+    if share_rows:
+        db.execute(insert(ExpenseShare), share_rows)
+    apply_ledger_deltas(db, group_id, deltas)
+    bump_ledger_version(db, group_id)
+    db.commit()
+    return len(rows)
+
+def import_expenses(db: Session, group_id: str, rows: List[Tuple[int, ExpenseCreate]]) -> Tuple[int, List[dict]]:
+    """Insert a batch of (line number, expense) rows; return (inserted, row errors).
+
+    The batch goes in as one transaction. If the database rejects it, the
+    rows are retried one at a time so only the offending ones are lost.
+    """
+    try:
+        return bulk_create_expenses(db, group_id, [expense for _, expense in rows]), []
+    except OperationalError:
+        raise
+    except StatementError:
+        db.rollback()
+    
+    inserted = 0
+    errors = []
+    for line_no, expense in rows:
+        try:
+            create_expense(db, group_id, expense)
+            inserted += 1
+        except OperationalError:
+            raise
+        except StatementError as e:
+            db.rollback()
+            errors.append({"line": line_no, "error": f"Could not be stored: {e.orig}"})
+    return inserted, errors
+
+def create_expenses_batch(db: Session, items: List[Tuple[str, ExpenseCreate]]) -> List[Expense]:
+    """Insert (group id, expense) pairs in one transaction; return the expenses in input order.
+
+    Rows go out as one INSERT ... RETURNING, so ids and timestamps come back
+    without a refresh per row. The returned objects are detached and fully
+    loaded, ready to serialize after the session closes.
+    """
+    now = utcnow()
+    rows = []
+    share_rows = []
+    deltas = defaultdict(new_ledger_deltas)
+    for group_id, expense in items:
+        row, expense_share_rows = expense_rows(group_id, expense, now)
+        rows.append(row)
+        share_rows.extend(expense_share_rows)
+        add_ledger_deltas(
+            deltas[group_id], expense.paid_by, row["amount_cents"],
+            [(share["person"], share["amount_cents"]) for share in expense_share_rows]
+        )
+    
+    expenses = db.scalars(insert(Expense).returning(Expense, sort_by_parameter_order=True), rows).all()
+    shares_by_expense = defaultdict(list)
+    if share_rows:
+        for share in db.scalars(insert(ExpenseShare).returning(ExpenseShare), share_rows):
+            shares_by_expense[share.expense_id].append(share)
+    for expense in expenses:
+        set_committed_value(
+            expense, "shares", sorted(shares_by_expense[expense.id], key=lambda share: share.person)
+        )
+    # Sorted so concurrent writers lock ledger rows in the same order
+    for group_id in sorted(deltas):
+        apply_ledger_deltas(db, group_id, deltas[group_id])
+        bump_ledger_version(db, group_id)
+    # Detach first so the commit does not expire what we hand back
+    db.expunge_all()
+    db.commit()
+    return expenses
+
+def update_expense(db: Session, group_id: str, expense_id: str, expense_update: ExpenseUpdate) -> Optional[Expense]:
+    """Update expense.
+
+    Raises ValueError if the split no longer fits the amount (an exact
+    split needs new shares when the amount changes).
+    """
+    db_expense = get_expense(db, group_id, expense_id)
     if not db_expense:
         return None
     
-    update_data = expense_update.dict(exclude_unset=True)
+    deltas = new_ledger_deltas()
+    add_ledger_deltas(
+        deltas, db_expense.paid_by, db_expense.amount_cents,
+        [(share.person, share.amount_cents) for share in db_expense.shares], sign=-1
+    )
+    
+    update_data = expense_update.dict(exclude_unset=True, exclude={'split_type', 'shares'})
+    if 'amount' in update_data:
+        update_data['amount_cents'] = expense_update.amount_cents
+        del update_data['amount']
+    amount_cents = update_data.get('amount_cents', db_expense.amount_cents)
+    
+    # Recompute the shares for a new split, or for the old one at a new amount
+    if expense_update.split_type is not None:
+        db_expense.split_type = expense_update.split_type
+        db_expense.shares = make_shares(
+            group_id, amount_cents, expense_update.split_type,
+            [(share.person, share.value) for share in expense_update.shares]
+        )
+    elif db_expense.split_type is not None and amount_cents != db_expense.amount_cents:
+        db_expense.shares = make_shares(
+            group_id, amount_cents, db_expense.split_type,
+            [(share.person, share.value) for share in db_expense.shares]
+        )
     for field, value in update_data.items():
         setattr(db_expense, field, value)
     
+    add_ledger_deltas(
+        deltas, db_expense.paid_by, db_expense.amount_cents,
+        [(share.person, share.amount_cents) for share in db_expense.shares]
+    )
+    apply_ledger_deltas(db, group_id, deltas)
+    bump_ledger_version(db, group_id)
+    
     db.commit()
-    db.refresh(db_expense)
     return db_expense
 
-def delete_expense(db: Session, expense_id: str) -> bool:
+def delete_expense(db: Session, group_id: str, expense_id: str) -> bool:
     """Delete expense"""
-    db_expense = get_expense(db, expense_id)
+    db_expense = get_expense(db, group_id, expense_id)
     if not db_expense:
         return False
     
+    deltas = new_ledger_deltas()
+    add_ledger_deltas(
+        deltas, db_expense.paid_by, db_expense.amount_cents,
+        [(share.person, share.amount_cents) for share in db_expense.shares], sign=-1
+    )
     db.delete(db_expense)
+    apply_ledger_deltas(db, group_id, deltas)
+    bump_ledger_version(db, group_id)
     db.commit()
     return True
 
-def get_all_people(db: Session) -> List[str]:
+def get_all_people(db: Session, group_id: str) -> List[str]:
     """Get all unique people from expenses"""
-    people = db.query(Expense.paid_by).distinct().all()
-    return sorted([person[0] for person in people])
+    people = (
+        db.query(PersonBalance.person)
+        .filter(PersonBalance.group_id == group_id)
+        .order_by(PersonBalance.person)
+        .all()
+    )
+    return [person[0] for person in people]
 
-def calculate_per_person_share(total_amount: float, num_people: int) -> float:
-    """Calculate each person's share, rounded to 2 decimal places"""
-    if num_people == 0:
-        return 0.0
-    return float(Decimal(str(total_amount / num_people)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+def upsert_statement(dialect_name: str):
+    """The dialect's INSERT supporting ON CONFLICT, or None"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
 
-def get_balances(db: Session) -> List[Balance]:
-    """Calculate balances for all people"""
-    expenses = get_expenses(db)
-    
-    if not expenses:
-        return []
-    
-    # Calculate total paid by each person
-    total_paid = defaultdict(float)
-    total_expenses = 0
-    
-    for expense in expenses:
-        total_paid[expense.paid_by] += expense.amount
-        total_expenses += expense.amount
-    
-    # Get all unique people
-    people = get_all_people(db)
-    num_people = len(people)
-    
-    if num_people == 0:
-        return []
-    
-    fair_share = calculate_per_person_share(total_expenses, num_people)
-    
-    # Calculate balances
-    balances = []
-    for person in people:
-        paid = total_paid.get(person, 0.0)
-        balance = paid - fair_share
-        balances.append(Balance(
+def apply_ledger_delta(
+    db: Session, group_id: str, person: str, amount_delta: int, count_delta: int,
+    owed_delta: int = 0, share_delta: int = 0
+):
+    """Apply a signed change to a person's ledger row in the current transaction"""
+    dialect_insert = upsert_statement(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        # One statement, so two transactions adding the same new person
+        # can't both miss the row and then collide inserting it
+        statement = dialect_insert(PersonBalance).values(
+            group_id=group_id,
             person=person,
-            total_paid=paid,
-            total_share=fair_share,
-            balance=round(balance, 2)
+            total_paid_cents=amount_delta,
+            expense_count=count_delta,
+            owed_cents=owed_delta,
+            share_count=share_delta
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[PersonBalance.group_id, PersonBalance.person],
+            set_={
+                "total_paid_cents": PersonBalance.total_paid_cents + statement.excluded.total_paid_cents,
+                "expense_count": PersonBalance.expense_count + statement.excluded.expense_count,
+                "owed_cents": PersonBalance.owed_cents + statement.excluded.owed_cents,
+                "share_count": PersonBalance.share_count + statement.excluded.share_count
+            }
         ))
+    else:
+        result = db.execute(
+            update(PersonBalance)
+            .where(PersonBalance.group_id == group_id, PersonBalance.person == person)
+            .values(
+                total_paid_cents=PersonBalance.total_paid_cents + amount_delta,
+                expense_count=PersonBalance.expense_count + count_delta,
+                owed_cents=PersonBalance.owed_cents + owed_delta,
+                share_count=PersonBalance.share_count + share_delta
+            )
+        )
+        if result.rowcount == 0:
+            db.add(PersonBalance(
+                group_id=group_id,
+                person=person,
+                total_paid_cents=amount_delta,
+                expense_count=count_delta,
+                owed_cents=owed_delta,
+                share_count=share_delta
+            ))
+            db.flush()
+            return
+    if count_delta < 0 or share_delta < 0:
+        db.execute(
+            delete(PersonBalance)
+            .where(
+                PersonBalance.group_id == group_id,
+                PersonBalance.person == person,
+                PersonBalance.expense_count <= 0,
+                PersonBalance.share_count <= 0
+            )
+        )
+
+def aggregate_expenses(db: Session, group_id: Optional[str] = None) -> List[Tuple[str, str, int, int]]:
+    """Get (group, person, cents paid, expense count) per payer in one GROUP BY over `expenses`"""
+    query = db.query(
+        Expense.group_id, Expense.paid_by, func.sum(Expense.amount_cents), func.count(Expense.id)
+    )
+    if group_id is not None:
+        query = query.filter(Expense.group_id == group_id)
+    rows = (
+        query.group_by(Expense.group_id, Expense.paid_by)
+        .order_by(Expense.group_id, Expense.paid_by)
+        .all()
+    )
+    return [(group, person, int(total), count) for group, person, total, count in rows]
+
+def aggregate_shares(db: Session, group_id: Optional[str] = None) -> List[Tuple[str, str, int, int]]:
+    """Get (group, person, cents owed, share count) per participant in one GROUP BY over `expense_shares`"""
+    query = db.query(
+        ExpenseShare.group_id, ExpenseShare.person,
+        func.sum(ExpenseShare.amount_cents), func.count(ExpenseShare.expense_id)
+    )
+    if group_id is not None:
+        query = query.filter(ExpenseShare.group_id == group_id)
+    rows = (
+        query.group_by(ExpenseShare.group_id, ExpenseShare.person)
+        .order_by(ExpenseShare.group_id, ExpenseShare.person)
+        .all()
+    )
+    return [(group, person, int(total), count) for group, person, total, count in rows]
+
+def aggregate_ledger(db: Session, group_id: Optional[str] = None) -> dict:
+    """Recompute the ledger from scratch: (group, person) -> (paid, count, owed, share count)"""
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for group, person, total, count in aggregate_expenses(db, group_id):
+        totals[group, person][0:2] = [total, count]
+    for group, person, total, count in aggregate_shares(db, group_id):
+        totals[group, person][2:4] = [total, count]
+    return {key: tuple(value) for key, value in totals.items()}
+
+def get_ledger_totals(db: Session, group_id: str) -> List[Tuple[str, int, int]]:
+    """Get (person, cents paid, cents owed by explicit shares) for every person from the ledger"""
+    return [
+        (person, paid, owed)
+        for person, paid, owed in db.query(
+            PersonBalance.person, PersonBalance.total_paid_cents, PersonBalance.owed_cents
+        )
+        .filter(PersonBalance.group_id == group_id)
+        .order_by(PersonBalance.person)
+    ]
+
+def balance_cents_from_totals(totals: List[Tuple[str, int, int]]) -> List[Tuple[str, int, int]]:
+    """Turn (person, cents paid, cents owed by shares) into (person, cents paid, cents owed).
+
+    Expenses without a split are pooled and the pool is split exactly
+    between everyone: shares differ by at most one cent and add up to the
+    pool, so the net balances always sum to zero.
+    """
+    pooled = sum(paid for _, paid, _ in totals) - sum(owed for _, _, owed in totals)
+    pool_shares = split_evenly(pooled, len(totals))
+    return [
+        (person, paid, owed + pool_share)
+        for (person, paid, owed), pool_share in zip(totals, pool_shares)
+    ]
+
+def get_balance_cents(db: Session, group_id: str) -> List[Tuple[str, int, int]]:
+    """Get (person, cents paid, cents owed) for every person"""
+    # The ledger holds one row per person, so this is O(people) no matter
+    # how many expenses or shares have been recorded
+    return balance_cents_from_totals(get_ledger_totals(db, group_id))
+
+def balance_dicts(balance_cents: List[Tuple[str, int, int]]) -> List[dict]:
+    """Turn (person, cents paid, cents owed) rows into plain Balance-shaped dicts"""
+    return [
+        {
+            "person": person,
+            "total_paid": from_cents(paid),
+            "total_share": from_cents(share),
+            "balance": from_cents(paid - share)
+        }
+        for person, paid, share in balance_cents
+    ]
+
+def to_balances(balance_cents: List[Tuple[str, int, int]]) -> List[Balance]:
+    """Turn (person, cents paid, cents owed) rows into Balance objects"""
+    return [Balance(**row) for row in balance_dicts(balance_cents)]
+
+def get_balances(db: Session, group_id: str) -> List[Balance]:
+    """Calculate balances for all people"""
+    return to_balances(get_balance_cents(db, group_id))
+
+def check_ledger(db: Session, group_id: Optional[str] = None) -> List[dict]:
+    """Compare the ledger with a full recompute; return one entry per mismatch"""
+    expected = aggregate_ledger(db, group_id)
+    ledger = db.query(PersonBalance)
+    if group_id is not None:
+        ledger = ledger.filter(PersonBalance.group_id == group_id)
+    actual = {
+        (row.group_id, row.person): (
+            row.total_paid_cents, row.expense_count, row.owed_cents, row.share_count
+        )
+        for row in ledger
+    }
     
-    return balances
+    mismatches = []
+    for key in sorted(expected.keys() | actual.keys()):
+        if expected.get(key) != actual.get(key):
+            mismatches.append({
+                "group_id": key[0],
+                "person": key[1],
+                "expected": expected.get(key),
+                "actual": actual.get(key)
+            })
+    return mismatches
 
-def calculate_settlements(db: Session) -> List[Settlement]:
-    """Calculate optimized settlements to minimize transactions"""
-    balances = get_balances(db)
+def rebuild_ledger(db: Session, group_id: Optional[str] = None) -> int:
+    """Recompute the ledger from `expenses` and `expense_shares` in one transaction; return row count"""
+    rows = aggregate_ledger(db, group_id)
     
-    if not balances:
-        return []
+    stale = delete(PersonBalance)
+    if group_id is not None:
+        stale = stale.where(PersonBalance.group_id == group_id)
+    db.execute(stale)
+    db.add_all([
+        PersonBalance(
+            group_id=group, person=person, total_paid_cents=paid, expense_count=count,
+            owed_cents=owed, share_count=share_count
+        )
+        for (group, person), (paid, count, owed, share_count) in rows.items()
+    ])
+    # Balances may have changed, so invalidate anything cached for them
+    versions = update(Group).values(ledger_version=Group.ledger_version + 1)
+    if group_id is not None:
+        versions = versions.where(Group.id == group_id)
+    db.execute(versions)
+    db.commit()
+    return len(rows)
+
+def settlement_dicts(balance_cents: List[Tuple[str, int, int]], mode: str = "greedy") -> List[dict]:
+    """Turn (person, cents paid, cents owed) rows into plain Settlement-shaped dicts"""
+    # Work in cents: balances sum to exactly zero, so every solver finishes
+    # with everyone settled and no epsilon is needed
+    balances = [(person, paid - share) for person, paid, share in balance_cents]
+    return [
+        {"from_person": debtor, "to_person": creditor, "amount": from_cents(amount)}
+        for debtor, creditor, amount in SOLVERS[mode](balances)
+    ]
+
+def settle(balance_cents: List[Tuple[str, int, int]], mode: str = "greedy") -> List[Settlement]:
+    """Turn (person, cents paid, cents owed) rows into settlements with the named solver"""
+    return [Settlement(**row) for row in settlement_dicts(balance_cents, mode)]
+
+def calculate_settlements(db: Session, group_id: str, mode: str = "greedy") -> List[Settlement]:
+    """Calculate settlements using the named solver ("greedy" or "optimal")"""
+    return settle(get_balance_cents(db, group_id), mode)
+
+def get_dashboard_version(db: Session, group_id: str) -> Optional[int]:
+    """Begin the dashboard's snapshot transaction and read the group's ledger
+    version in it; None if there is no such group"""
+    begin_snapshot(db)
+    if get_group(db, group_id) is None:
+        return None
+    return get_ledger_version(db, group_id)
+
+def get_dashboard(
+    db: Session, group_id: str, cursor: Optional[str] = None, limit: int = 100
+) -> Tuple[List[Expense], Optional[str], List[Tuple[str, int, int]]]:
+    """Read the rest of the dashboard in the snapshot `get_dashboard_version` began.
+
+    Returns (expense page, next cursor, balance cents); balances and
+    settlements are both derived from the balance cents, so the ledger is
+    read once and all parts describe the same version.
+    Raises ValueError for a malformed cursor.
+    """
+    expenses, next_cursor = get_expenses_page(db, group_id, cursor, limit)
+    return expenses, next_cursor, get_balance_cents(db, group_id)
+
+def create_sample_data(db: Session) -> bool:
+    """Create sample data in the default group if it has no expenses; return whether it did"""
+    ensure_default_group(db)
+    # One index probe rather than a count of the whole table
+    has_expenses = db.query(
+        db.query(Expense.id).filter(Expense.group_id == DEFAULT_GROUP_ID).exists()
+    ).scalar()
+    if has_expenses:
+        return False
     
-    # Separate creditors (positive balance) and debtors (negative balance)
-    creditors = [(b.person, b.balance) for b in balances if b.balance > 0.01]
-    debtors = [(b.person, -b.balance) for b in balances if b.balance < -0.01]
-    
-    settlements = []
-    
-    # Sort creditors and debtors by amount (largest first)
-    creditors.sort(key=lambda x: x[1], reverse=True)
-    debtors.sort(key=lambda x: x[1], reverse=True)
-    
-    i, j = 0, 0
-    while i < len(creditors) and j < len(debtors):
-        creditor, credit_amount = creditors[i]
-        debtor, debt_amount = debtors[j]
-        
-        # Calculate settlement amount
-        settlement_amount = min(credit_amount, debt_amount)
-        
-        if settlement_amount > 0.01:
-            settlements.append(Settlement(
-                from_person=debtor,
-                to_person=creditor,
-                amount=round(settlement_amount, 2)
-            ))
-            
-            # Update remaining amounts
-            creditors[i] = (creditor, credit_amount - settlement_amount)
-            debtors[j] = (debtor, debt_amount - settlement_amount)
-        
-        # Move to next creditor or debtor
-        if creditors[i][1] <= 0.01:
-            i += 1
-        if debtors[j][1] <= 0.01:
-            j += 1
-    
-    return settlements
-
-def create_sample_data(db: Session):
-    """Create sample data if no expenses exist"""
-    existing_expenses = db.query(Expense).count()
-    
-    if existing_expenses == 0:
-        sample_expenses = [
-            {"amount": 600.0, "description": "Dinner at restaurant", "paid_by": "Shantanu"},
-            {"amount": 450.0, "description": "Groceries", "paid_by": "Sanket"},
-            {"amount": 300.0, "description": "Petrol", "paid_by": "Om"},
-            {"amount": 500.0, "description": "Movie Tickets", "paid_by": "Shantanu"},
-            {"amount": 280.0, "description": "Pizza", "paid_by": "Sanket"}
-        ]
-        
-        for expense_data in sample_expenses:
-            expense = ExpenseCreate(**expense_data)
-            create_expense(db, expense)
-        
-        print("✅ Sample data created successfully")
\ No newline at end of file
+    sample_expenses = [
+        {"amount": 600.0, "description": "Dinner at restaurant", "paid_by": "Shantanu"},
+        {"amount": 450.0, "description": "Groceries", "paid_by": "Sanket"},
+        {"amount": 300.0, "description": "Petrol", "paid_by": "Om"},
+        {"amount": 500.0, "description": "Movie Tickets", "paid_by": "Shantanu"},
+        {"amount": 280.0, "description": "Pizza", "paid_by": "Sanket"}
+    ]
+    
+    for expense_data in sample_expenses:
+        expense = ExpenseCreate(**expense_data)
+        create_expense(db, DEFAULT_GROUP_ID, expense)
+    return True
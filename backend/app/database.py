@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -6,25 +7,101 @@ import os
 # Database URL from environment variable
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/splitapp")
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
+# Request handlers use an asyncio driver unless DB_ASYNC=0, in which case
+# they fall back to the sync engine (handy for SQLite without aiosqlite)
+DB_ASYNC = os.getenv("DB_ASYNC", "1") != "0"
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+ENGINE_OPTIONS = dict(
     pool_pre_ping=True,
     pool_recycle=300,
     pool_size=10,
     max_overflow=20
 )
 
+def async_url(url: str) -> str:
+    """Swap the driver in a sync database URL for its asyncio counterpart"""
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+# Create SQLAlchemy engine
+engine = create_engine(DATABASE_URL, **ENGINE_OPTIONS)
+
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects returned from crud are used after the session commits; every
+# column value is generated in-app, so nothing needs re-reading afterwards
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    # Imported here so the sync fallback works without greenlet installed
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    
+    async_engine = create_async_engine(async_url(DATABASE_URL), **ENGINE_OPTIONS)
+    
+    # Objects returned from crud are used after the session commits, so don't
+    # expire them (an expired attribute would need a lazy load outside run_sync)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Create Base class for models
 Base = declarative_base()
 
+class SyncSessionAdapter:
+    """Give a sync Session the `run_sync` interface of AsyncSession"""
+    
+    def __init__(self, session):
+        self.sync_session = session
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.sync_session, *args, **kwargs)
+
+def begin_snapshot(db):
+    """Begin a transaction in which every read sees one snapshot; call it
+    before the session's first statement"""
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        # READ COMMITTED takes a new snapshot per statement
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    elif dialect_name == "sqlite":
+        # pysqlite opens no transaction before a SELECT, so each statement
+        # would see the latest commit; an explicit BEGIN holds one read
+        # snapshot (taken at the first read) until the session ends. Outside
+        # WAL mode writers wait for it, as they do for any open read cursor
+        db.connection().exec_driver_sql("BEGIN")
+    else:
+        db.connection()
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Session for code outside request dependencies (background tasks,
+# streams); it has the same `run_sync` interface as get_async_db's
+@asynccontextmanager
+async def open_session():
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield SyncSessionAdapter(db)
+        finally:
+            db.close()
+
+# Dependency for request handlers: crud functions are driven through
+# `await db.run_sync(fn, ...)`, which keeps IO off the event loop when the
+# asyncio driver is in use
+async def get_async_db():
+    async with open_session() as db:
+        yield db
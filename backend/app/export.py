@@ -0,0 +1,211 @@
+"""Streaming export of a group's expenses, balances and settlements.
+
+Rows are read through a server-side cursor (`yield_per`) and encoded a
+partition at a time, so memory use stays flat whatever the table size.
+Everything in one export is read inside a single snapshot transaction:
+the balances and settlements at the end of an NDJSON export describe
+exactly the expenses that precede them.
+
+Split expenses carry their split_type and shares (person, split value
+and amount owed): an array in NDJSON, a JSON string column in CSV and
+Parquet. Bulk import reads both back, so an export re-imports faithfully.
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import select, desc
+from starlette.concurrency import iterate_in_threadpool
+
+from .database import DB_ASYNC, AsyncSessionLocal, SessionLocal, begin_snapshot
+from .models import Expense, ExpenseShare
+from .money import from_cents
+from .crud import get_balances, calculate_settlements
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+COLUMNS = ["id", "amount", "description", "paid_by", "split_type", "shares", "created_at", "updated_at"]
+
+# Rows fetched from the server-side cursor per round trip
+PARTITION_SIZE = 1000
+
+def _query(group_id: str):
+    return (
+        select(
+            Expense.id, Expense.amount_cents, Expense.description, Expense.paid_by,
+            Expense.split_type, Expense.created_at, Expense.updated_at
+        )
+        .where(Expense.group_id == group_id)
+        .order_by(desc(Expense.created_at), desc(Expense.id))
+        .execution_options(yield_per=PARTITION_SIZE)
+    )
+
+def load_shares(db, rows) -> dict:
+    """Shares of the split expenses among `rows`, by expense id; one query per partition"""
+    split_ids = [row.id for row in rows if row.split_type is not None]
+    if not split_ids:
+        return {}
+    shares = {}
+    result = db.execute(
+        select(ExpenseShare.expense_id, ExpenseShare.person, ExpenseShare.value, ExpenseShare.amount_cents)
+        .where(ExpenseShare.expense_id.in_(split_ids))
+        .order_by(ExpenseShare.expense_id, ExpenseShare.person)
+    )
+    for expense_id, person, value, amount_cents in result:
+        shares.setdefault(expense_id, []).append(
+            {"person": person, "value": value, "amount": from_cents(amount_cents)}
+        )
+    return shares
+
+def _records(rows, shares: dict):
+    for expense_id, amount_cents, description, paid_by, split_type, created_at, updated_at in rows:
+        yield {
+            "id": str(expense_id),
+            "amount": from_cents(amount_cents),
+            "description": description,
+            "paid_by": paid_by,
+            "split_type": split_type,
+            "shares": shares.get(expense_id) if split_type is not None else None,
+            "created_at": created_at.isoformat(),
+            "updated_at": updated_at.isoformat()
+        }
+
+def _flat_records(rows, shares: dict):
+    """Records for tabular formats, with shares as a JSON string"""
+    for record in _records(rows, shares):
+        if record["shares"] is not None:
+            record["shares"] = json.dumps(record["shares"])
+        yield record
+
+class CSVEncoder:
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.DictWriter(self.buffer, fieldnames=COLUMNS)
+    
+    def _flush(self) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+    
+    def start(self) -> bytes:
+        self.writer.writeheader()
+        return self._flush()
+    
+    def encode(self, rows, shares) -> bytes:
+        self.writer.writerows(_flat_records(rows, shares))
+        return self._flush()
+    
+    def finish(self, balances, settlements) -> bytes:
+        # A CSV holds one table; use NDJSON to get the summary records
+        return b""
+
+class NDJSONEncoder:
+    def start(self) -> bytes:
+        return b""
+    
+    def encode(self, rows, shares) -> bytes:
+        return "".join(
+            json.dumps({"type": "expense", **record}) + "\n" for record in _records(rows, shares)
+        ).encode()
+    
+    def finish(self, balances, settlements) -> bytes:
+        lines = [json.dumps({"type": "balance", **b.model_dump()}) for b in balances]
+        lines += [json.dumps({"type": "settlement", **s.model_dump()}) for s in settlements]
+        return "".join(line + "\n" for line in lines).encode()
+
+class _ChunkSink:
+    """File-like target for pyarrow that hands written bytes back to us"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+class ParquetEncoder:
+    def __init__(self):
+        # Optional dependency: only needed for format=parquet
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        self.pa = pa
+        self.schema = pa.schema([
+            ("id", pa.string()),
+            ("amount", pa.float64()),
+            ("description", pa.string()),
+            ("paid_by", pa.string()),
+            ("split_type", pa.string()),
+            ("shares", pa.string()),
+            ("created_at", pa.string()),
+            ("updated_at", pa.string()),
+        ])
+        self.sink = _ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema)
+    
+    def start(self) -> bytes:
+        return self.sink.drain()
+    
+    def encode(self, rows, shares) -> bytes:
+        table = self.pa.Table.from_pylist(list(_flat_records(rows, shares)), schema=self.schema)
+        self.writer.write_table(table)
+        return self.sink.drain()
+    
+    def finish(self, balances, settlements) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+ENCODERS = {
+    "csv": CSVEncoder,
+    "ndjson": NDJSONEncoder,
+    "parquet": ParquetEncoder,
+}
+
+def make_encoder(fmt: str):
+    """Build the encoder for `fmt`; raises ImportError if parquet support is missing"""
+    return ENCODERS[fmt]()
+
+async def _export_async(group_id: str, encoder):
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(begin_snapshot)
+        yield encoder.start()
+        result = await db.stream(_query(group_id))
+        async for rows in result.partitions():
+            yield encoder.encode(rows, await db.run_sync(load_shares, rows))
+        balances = await db.run_sync(get_balances, group_id)
+        settlements = await db.run_sync(calculate_settlements, group_id)
+        yield encoder.finish(balances, settlements)
+
+def _export_sync(group_id: str, encoder):
+    db = SessionLocal()
+    try:
+        begin_snapshot(db)
+        yield encoder.start()
+        for rows in db.execute(_query(group_id)).partitions():
+            yield encoder.encode(rows, load_shares(db, rows))
+        yield encoder.finish(get_balances(db, group_id), calculate_settlements(db, group_id))
+    finally:
+        db.close()
+
+def stream_export(group_id: str, encoder):
+    """Async iterator of encoded chunks for a StreamingResponse"""
+    if DB_ASYNC:
+        return _export_async(group_id, encoder)
+    return iterate_in_threadpool(_export_sync(group_id, encoder))
@@ -0,0 +1,104 @@
+"""Group commit for expense creation.
+
+With GROUP_COMMIT=1, POST /expenses hands its row to a single writer task
+instead of committing on its own. The writer collects rows until
+GROUP_COMMIT_MAX_ROWS are waiting or GROUP_COMMIT_MAX_DELAY_MS has passed
+since the first one, inserts them all in one transaction (one commit, one
+fsync) and resolves each caller with its own expense.
+
+The delay is the latency/throughput trade-off: a lone request waits at
+most that long, while a burst of requests shares a single commit.
+"""
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from .database import open_session
+from .crud import create_expense, create_expenses_batch
+from .schemas import ExpenseCreate
+
+logger = logging.getLogger(__name__)
+
+GROUP_COMMIT = os.getenv("GROUP_COMMIT", "0") == "1"
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "5"))
+GROUP_COMMIT_MAX_ROWS = int(os.getenv("GROUP_COMMIT_MAX_ROWS", "500"))
+
+class GroupCommitWriter:
+    def __init__(self, max_delay: float, max_rows: int):
+        self.max_delay = max_delay
+        self.max_rows = max_rows
+        self.queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    async def submit(self, group_id: str, expense: ExpenseCreate):
+        """Queue one expense and wait for the commit that includes it"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((group_id, expense, future))
+        return await future
+
+    async def close(self):
+        """Commit whatever is queued, then stop the writer"""
+        if self.task is None:
+            return
+        await self.queue.join()
+        self.task.cancel()
+        self.task = None
+
+    async def _collect(self) -> List[Tuple[str, ExpenseCreate, asyncio.Future]]:
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_rows:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _flush(self, batch):
+        try:
+            async with open_session() as db:
+                expenses = await db.run_sync(
+                    create_expenses_batch, [(group_id, expense) for group_id, expense, _ in batch]
+                )
+        except Exception:
+            # One bad row must not fail its neighbours: retry them one by one
+            logger.exception("Group commit of %d expenses failed; retrying individually", len(batch))
+            for group_id, expense, future in batch:
+                try:
+                    async with open_session() as db:
+                        result = await db.run_sync(create_expense, group_id, expense)
+                except Exception as e:
+                    result = e
+                self._resolve(future, result)
+            return
+
+        for (_, _, future), expense in zip(batch, expenses):
+            self._resolve(future, expense)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result):
+        # The caller may have gone away (client disconnect cancels it)
+        if future.done():
+            return
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+writer = GroupCommitWriter(GROUP_COMMIT_MAX_DELAY_MS / 1000, GROUP_COMMIT_MAX_ROWS)
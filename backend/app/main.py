@@ -1,17 +1,24 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, JSONResponse, Response
+from sqlalchemy.exc import SQLAlchemyError
+import math
 import os
 
-from .database import engine, get_db
-from .models import Base
-from .api import expenses, balances, settlements
-from .crud import create_sample_data
+from .database import engine, async_engine, get_async_db
+from .api import groups, expenses, balances, settlements, dashboard, stream
+from .schema import current_revision, head_revision
+from .replicas import ReadYourWritesMiddleware, replicas
+from .admission import rate_limit
+from . import group_commit, metrics
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed by migrations (python -m app.manage migrate), so
+# importing the app touches no tables and any number of workers can start
+# at once
 
 app = FastAPI(
     title="Split App Backend",
@@ -31,13 +38,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses above GZIP_MINIMUM_SIZE bytes; small ones (and 304s)
+# are not worth the CPU. Server-Sent Events are never buffered for gzip.
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1024")))
+
+# Keep a client's reads on the primary just after it writes (see replicas.py)
+if replicas.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Instrument requests and queries (see /metrics); outermost, so latency and
+# sizes are what the client sees
+metrics.instrument_engine(engine, "sync")
+if async_engine is not None:
+    metrics.instrument_engine(async_engine, "async")
+for replica in replicas.replicas:
+    metrics.instrument_engine(replica.engine, f"{replica.name}_sync")
+    if replica.async_engine is not None:
+        metrics.instrument_engine(replica.async_engine, f"{replica.name}_async")
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Mount static files (frontend)
 app.mount("/static", StaticFiles(directory="/app/frontend/static"), name="static")
 
-# Include API routers
-app.include_router(expenses.router, prefix="/api", tags=["expenses"])
-app.include_router(balances.router, prefix="/api", tags=["balances"])
-app.include_router(settlements.router, prefix="/api", tags=["settlements"])
+# Include API routers; everything except group management is scoped to a
+# group, and the un-prefixed /api routes act on the default group. Every
+# API request is charged against its client's rate limit (off unless
+# RATE_LIMIT_PER_SECOND is set)
+api_dependencies = [Depends(rate_limit)]
+app.include_router(groups.router, prefix="/api", tags=["groups"], dependencies=api_dependencies)
+for router, tag in [
+    (expenses.router, "expenses"),
+    (balances.router, "balances"),
+    (settlements.router, "settlements"),
+    (dashboard.router, "dashboard"),
+    (stream.router, "stream"),
+]:
+    app.include_router(router, prefix="/api/groups/{group_id}", tags=[tag], dependencies=api_dependencies)
+    app.include_router(router, prefix="/api", tags=[tag], dependencies=api_dependencies)
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's 422 response, with NaN and infinite inputs echoed back as strings
+    (JSON has no literal for them, so the default handler fails to encode them)"""
+    errors = jsonable_encoder(
+        exc.errors(), custom_encoder={float: lambda v: v if math.isfinite(v) else str(v)}
+    )
+    return JSONResponse(status_code=422, content={"detail": errors})
 
 @app.get("/")
 async def serve_frontend():
@@ -53,29 +99,63 @@ async def root():
             "version": "1.0.0",
             "endpoints": {
                 "docs": "/api/docs",
+                "health": "/health",
+                "ready": "/ready",
                 "frontend": "/",
+                "groups": "/api/groups",
                 "expenses": "/api/expenses",
                 "balances": "/api/balances",
-                "settlements": "/api/settlements"
+                "settlements": "/api/settlements",
+                "dashboard": "/api/dashboard",
+                "stream": "/api/stream",
+                "metrics": "/metrics"
             }
         }
     }
 
 @app.get("/health")
 async def health_check():
+    """Liveness: the process is serving requests (no database access)"""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check(db = Depends(get_async_db)):
+    """Readiness: the database answers and is migrated to this code's schema"""
+    try:
+        revision = await db.run_sync(current_revision)
+    except (SQLAlchemyError, OSError) as e:
+        return JSONResponse({"status": "unavailable", "detail": str(e)}, status_code=503)
+    if revision != head_revision():
+        return JSONResponse(
+            {"status": "migration pending", "revision": revision, "expected": head_revision()},
+            status_code=503
+        )
+    return {
+        "status": "ready",
+        "revision": revision,
+        # Informational: reads fall back to the primary without replicas
+        "replicas": {
+            replica.name: {"healthy": replica.healthy, "lag_seconds": replica.lag}
+            for replica in replicas.replicas
+        }
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database with sample data"""
-    db = next(get_db())
-    try:
-        create_sample_data(db)
-        print("✅ Sample data initialized")
-    except Exception as e:
-        print(f"⚠️  Sample data initialization: {e}")
-    finally:
-        db.close()
+    """Check the read replicas, if any, before taking traffic"""
+    await replicas.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Commit expenses still waiting in the group-commit queue"""
+    await replicas.stop()
+    await group_commit.writer.close()
 
 if __name__ == "__main__":
     import uvicorn
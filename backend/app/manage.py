@@ -0,0 +1,84 @@
+"""Maintenance commands.
+
+    python -m app.manage migrate          # upgrade the schema; run once per deploy
+    python -m app.manage migrate --seed   # ...then add sample data to an empty default group
+    python -m app.manage seed             # add sample data to an empty default group
+    python -m app.manage ledger check     # exit code 1 if the ledger has drifted
+    python -m app.manage ledger rebuild   # recompute person_balances from expenses
+
+SEED_SAMPLE_DATA=1 has the same effect as `migrate --seed`.
+"""
+import argparse
+import os
+import sys
+
+from .database import SessionLocal
+from .crud import check_ledger, create_sample_data, rebuild_ledger
+from . import schema
+
+
+def seed_command(args) -> int:
+    db = SessionLocal()
+    try:
+        if create_sample_data(db):
+            print("✅ Sample data created successfully")
+        else:
+            print("Default group already has expenses; no sample data added")
+        return 0
+    finally:
+        db.close()
+
+
+def migrate_command(args) -> int:
+    schema.upgrade()
+    print(f"✅ Database schema at {schema.head_revision()}")
+    if args.seed or os.getenv("SEED_SAMPLE_DATA") == "1":
+        return seed_command(args)
+    return 0
+
+
+def ledger_command(args) -> int:
+    db = SessionLocal()
+    try:
+        if args.action == "check":
+            mismatches = check_ledger(db, args.group)
+            for mismatch in mismatches:
+                print(
+                    f"❌ {mismatch['group_id']}/{mismatch['person']}: "
+                    f"expected {mismatch['expected']}, found {mismatch['actual']}"
+                )
+            if mismatches:
+                print(f"Ledger has {len(mismatches)} mismatched row(s); run 'ledger rebuild'")
+                return 1
+            print("✅ Ledger is consistent with expenses")
+            return 0
+        
+        count = rebuild_ledger(db, args.group)
+        print(f"✅ Ledger rebuilt with {count} row(s)")
+        return 0
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    migrate = subparsers.add_parser("migrate", help="Upgrade the database schema to the latest migration")
+    migrate.add_argument("--seed", action="store_true", help="Then add sample data if the default group is empty")
+    migrate.set_defaults(func=migrate_command)
+    
+    seed = subparsers.add_parser("seed", help="Add sample data if the default group is empty")
+    seed.set_defaults(func=seed_command)
+    
+    ledger = subparsers.add_parser("ledger", help="Check or rebuild the person_balances ledger")
+    ledger.add_argument("action", choices=["check", "rebuild"])
+    ledger.add_argument("--group", help="Only this group ID (default: all groups)")
+    ledger.set_defaults(func=ledger_command)
+    
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
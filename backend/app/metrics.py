@@ -0,0 +1,193 @@
+"""Request and database instrumentation, exposed for Prometheus on /metrics.
+
+`MetricsMiddleware` times every HTTP request and records its response
+size under the route template (``/api/groups/{group_id}/balances``, not
+the concrete path), so label cardinality stays bounded. `instrument_engine`
+hooks a SQLAlchemy engine so each query is counted and timed against the
+route that issued it, and queries slower than SLOW_QUERY_MS are logged
+with that route. Waits for a pooled connection are timed per checkout,
+and connection pool gauges are read when /metrics is scraped.
+
+Metrics live in this process; with several server workers each one
+reports its own.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to serve a request", ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served")
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size", ["route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+)
+QUERY_LATENCY = Histogram("db_query_duration_seconds", "Time to run one SQL statement", ["route"])
+QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements issued while serving a request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+REQUESTS_SHED = Counter(
+    "http_requests_shed_total", "Requests turned away by admission control", ["route", "reason"]
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time to get a connection from the pool (includes opening a new one; failed waits count too)",
+    ["engine", "route"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+)
+
+# name -> QueuePool of each instrumented engine
+POOLS = {}
+
+class RequestStats:
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+    
+    @property
+    def route(self) -> str:
+        return route_of(self.scope)
+
+# Stats of the request being served; database hooks add to it. Outside a
+# request (startup, background writers) queries are filed under "-"
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def route_of(scope) -> str:
+    """The full route template a request matched, or "unmatched".
+
+    Routers included under a prefix keep their own routes, so the matched
+    route only knows its path below the prefix; the prefix is rebuilt from
+    the request path with its parameter values put back as names.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        # Mounted apps (static files) only leave their mount point behind
+        return scope.get("root_path") or "unmatched"
+    
+    segments = [s for s in scope["path"].split("/") if s]
+    depth = len([s for s in template.split("/") if s])
+    own = set(route.param_convertors)
+    names = {value: name for name, value in scope.get("path_params", {}).items() if name not in own}
+    prefix = ["{%s}" % names[s] if s in names else s for s in segments[:len(segments) - depth]]
+    return "".join("/" + s for s in prefix) + template
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and response sizes.
+    
+    Plain ASGI rather than BaseHTTPMiddleware so streamed responses pass
+    through untouched. Event streams stay open for a client's whole visit,
+    so they are counted in flight but left out of the latency and size
+    histograms.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # The router fills in the route once it has matched one
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        response = {"status": 500, "size": 0, "streaming": False}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type" and value.startswith(b"text/event-stream"):
+                        response["streaming"] = True
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+        
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            current_request.reset(token)
+            route = route_of(scope)
+            if not response["streaming"]:
+                REQUEST_LATENCY.labels(scope["method"], route, str(response["status"])).observe(elapsed)
+                RESPONSE_SIZE.labels(route).observe(response["size"])
+                QUERIES_PER_REQUEST.labels(route).observe(stats.queries)
+
+def instrument_engine(engine, name: str):
+    """Time every statement run on `engine` and watch its connection pool"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+    
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = current_request.get()
+        route = stats.route if stats is not None else "-"
+        if stats is not None:
+            stats.queries += 1
+        QUERY_LATENCY.labels(route).observe(elapsed)
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            logger.warning("Slow query (%.1f ms) for %s: %s", elapsed * 1000, route, statement)
+    
+    pool = sync_engine.pool
+    if hasattr(pool, "checkedout"):
+        # The pool has no event before a checkout starts waiting, so time
+        # the call that blocks until one is free (or pool_timeout passes)
+        connect = pool.connect
+        
+        def timed_connect():
+            start = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                stats = current_request.get()
+                POOL_WAIT.labels(name, stats.route if stats is not None else "-").observe(
+                    time.perf_counter() - start
+                )
+        
+        pool.connect = timed_connect
+        POOLS[name] = pool
+
+class PoolCollector:
+    """Connection pool gauges, read at scrape time"""
+    
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Connections open beyond the pool size (negative: not yet opened)",
+            labels=["engine"]
+        )
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        for name, pool in POOLS.items():
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], pool.overflow())
+            size.add_metric([name], pool.size())
+        yield checked_out
+        yield overflow
+        yield size
+
+REGISTRY.register(PoolCollector())
+
+def render():
+    """The current metrics in Prometheus text format, and their content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,19 +1,101 @@
-from sqlalchemy import Column, String, Float, DateTime, Text, Index
+from sqlalchemy import Column, String, BigInteger, Integer, Float, DateTime, Text, Index, ForeignKey, Uuid
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
+import os
+import time
+import uuid
 from .database import Base
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _uuid7() -> uuid.UUID:
+    # RFC 9562 UUIDv7: 48-bit Unix milliseconds, then version, variant and random bits
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
+
+# Time-ordered ids: new rows land at the right edge of the primary key
+# index instead of at random pages all over it
+uuid7 = getattr(uuid, "uuid7", _uuid7)
+
+# Group used by the un-prefixed /api routes
+DEFAULT_GROUP_ID = "default"
+
+class Group(Base):
+    """An independent set of people sharing expenses (a trip, a household...)"""
+    __tablename__ = "groups"
+    
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every expense write in the group; keys derived-data caches
+    ledger_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
 class Expense(Base):
     __tablename__ = "expenses"
     
-    id = Column(String, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
+    id = Column(Uuid, primary_key=True, index=True, default=uuid7)
+    group_id = Column(String, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+    # Stored in cents; see money.py
+    amount_cents = Column(BigInteger, nullable=False)
     description = Column(Text, nullable=False)
-    paid_by = Column(String, nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    paid_by = Column(String, nullable=False)
+    # None: shared evenly by the whole group; otherwise see splits.py
+    split_type = Column(String(16), nullable=True)
+    # Timestamps are set by the app as well as the server so they come back
+    # in the same form the cursor compares against (SQLite's CURRENT_TIMESTAMP
+    # has no fractional seconds and would not sort against bound values)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
     
     # Add indexes for better query performance
     __table_args__ = (
-        Index('idx_expenses_paid_by', 'paid_by'),
         Index('idx_expenses_created_at', 'created_at'),
-    )
\ No newline at end of file
+        # Every read is scoped to one group; `id` breaks created_at ties for
+        # keyset pagination
+        Index('idx_expenses_group_created_at', 'group_id', 'created_at', 'id'),
+        # One payer's expenses, newest first, paged the same way
+        Index('idx_expenses_group_paid_by', 'group_id', 'paid_by', 'created_at', 'id'),
+        Index('idx_expenses_group_amount', 'group_id', 'amount_cents'),
+        # Description search indexes are dialect-specific; see search.py
+    )
+    
+    # Loaded with one extra IN query per result set rather than per row
+    shares = relationship(
+        "ExpenseShare", lazy="selectin", cascade="all, delete-orphan",
+        passive_deletes=True, order_by="ExpenseShare.person"
+    )
+
+class ExpenseShare(Base):
+    """One participant's fixed share of an expense that has a split"""
+    __tablename__ = "expense_shares"
+    
+    expense_id = Column(Uuid, ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True)
+    person = Column(String, primary_key=True)
+    group_id = Column(String, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+    amount_cents = Column(BigInteger, nullable=False)
+    # The split input (amount, percentage or weight), kept so the share can
+    # be recomputed when the expense amount changes
+    value = Column(Float, nullable=True)
+    
+    __table_args__ = (
+        # Ledger checks aggregate shares per (group, person)
+        Index('idx_expense_shares_group_person', 'group_id', 'person'),
+    )
+
+class PersonBalance(Base):
+    """Running per-person totals, kept in step with `expenses` by crud writes"""
+    __tablename__ = "person_balances"
+    
+    group_id = Column(String, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True)
+    person = Column(String, primary_key=True)
+    total_paid_cents = Column(BigInteger, nullable=False, default=0)
+    # Number of expenses paid by this person
+    expense_count = Column(Integer, nullable=False, default=0)
+    # Sum and number of this person's explicit shares (expense_shares);
+    # the row is removed once both counts reach zero
+    owed_cents = Column(BigInteger, nullable=False, default=0, server_default="0")
+    share_count = Column(Integer, nullable=False, default=0, server_default="0")
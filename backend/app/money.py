@@ -0,0 +1,56 @@
+"""Money helpers.
+
+Amounts are stored and aggregated as integer minor units (cents). Floats
+only appear at the API edge, where these helpers convert in and out.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List
+import math
+
+CENT = Decimal('0.01')
+
+# Largest amount accepted for one expense (or filter bound); sums of many
+# of them stay far inside a BIGINT of cents
+MAX_AMOUNT = 1_000_000_000
+
+def to_cents(amount: float) -> int:
+    """Convert a decimal amount from the API into integer cents.
+
+    Raises ValueError for NaN, infinities and amounts beyond MAX_AMOUNT.
+    """
+    if not math.isfinite(amount):
+        raise ValueError('Amount must be a finite number')
+    if abs(amount) > MAX_AMOUNT:
+        raise ValueError(f'Amount cannot exceed {MAX_AMOUNT}')
+    return int(Decimal(str(amount)).quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+
+def from_cents(cents: int) -> float:
+    """Convert integer cents back into a decimal amount for the API"""
+    return cents / 100
+
+def split_evenly(total_cents: int, num_people: int) -> List[int]:
+    """Split `total_cents` into `num_people` shares that add up exactly.
+
+    Every share is `total_cents // num_people`; the leftover cents go one
+    each to the first shares, so no two shares differ by more than a cent.
+    """
+    if num_people == 0:
+        return []
+    base, remainder = divmod(total_cents, num_people)
+    return [base + 1 if i < remainder else base for i in range(num_people)]
+
+def allocate(total_cents: int, weights: List[Decimal]) -> List[int]:
+    """Split `total_cents` in proportion to `weights`, adding up exactly.
+
+    Largest-remainder rounding: every share is rounded down, then the
+    leftover cents go one each to the shares that lost the most, earlier
+    shares winning ties.
+    """
+    weight_sum = sum(weights)
+    exact = [total_cents * weight / weight_sum for weight in weights]
+    shares = [int(share) for share in exact]
+    leftover = total_cents - sum(shares)
+    by_remainder = sorted(range(len(weights)), key=lambda i: shares[i] - exact[i])
+    for i in by_remainder[:leftover]:
+        shares[i] += 1
+    return shares
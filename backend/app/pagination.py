@@ -0,0 +1,23 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor encodes the sort key of the last row on a page, `(created_at,
+id)`, so the next page is a range scan from that key instead of an
+OFFSET that has to walk every earlier row.
+"""
+import base64
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor; raises ValueError if it was not made by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,207 @@
+"""Read replicas for the read-only endpoints.
+
+DATABASE_REPLICA_URLS is a comma-separated list of database URLs holding
+copies of the primary. When it is set, GET requests to the read-only
+endpoints (expenses, people, balances, settlements, dashboard) take
+their session from `get_read_db`, which picks a healthy replica round
+robin. Writes, the event stream and exports stay on the primary.
+
+A replica is used only while it is healthy. A background task checks
+each one every REPLICA_CHECK_INTERVAL seconds; it is taken out when the
+check fails, when Postgres reports replication lag above
+REPLICA_MAX_LAG_SECONDS, or when a query on it fails with a connection
+error, and put back by the next good check. With no healthy replica,
+reads go to the primary.
+
+Read-your-writes: a successful write response sets a cookie that sends
+that client's reads to the primary for READ_YOUR_WRITES_SECONDS, which
+should exceed the lag a replica may have and still be used.
+
+Locally, point DATABASE_URL and DATABASE_REPLICA_URLS at two SQLite files
+(copy the migrated primary to make the replica); SQLite has no lag to
+report, so only the health check and the cookie apply.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from .database import (
+    DB_ASYNC, ENGINE_OPTIONS, SyncSessionAdapter, async_url, get_async_db, open_session
+)
+
+logger = logging.getLogger(__name__)
+
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "2"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+WROTE_COOKIE = "splitapp_wrote_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Seconds the replica's applied WAL is behind what it has received; 0 when
+# caught up (an idle primary is not lag) or when the server is not a standby
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(url, **ENGINE_OPTIONS)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self.async_engine = None
+        if DB_ASYNC:
+            from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+            
+            self.async_engine = create_async_engine(async_url(url), **ENGINE_OPTIONS)
+            self.AsyncSessionLocal = async_sessionmaker(
+                self.async_engine, autoflush=False, expire_on_commit=False
+            )
+        # Unknown until the first check
+        self.healthy = False
+        self.lag: Optional[float] = None
+    
+    @asynccontextmanager
+    async def open_session(self):
+        """A session on this replica; a connection error takes the replica out of rotation"""
+        try:
+            if DB_ASYNC:
+                async with self.AsyncSessionLocal() as db:
+                    yield db
+            else:
+                db = self.SessionLocal()
+                try:
+                    yield SyncSessionAdapter(db)
+                finally:
+                    db.close()
+        except (OperationalError, OSError) as e:
+            self.mark_down(f"query failed: {e}")
+            raise
+    
+    def check(self):
+        """Measure health and lag (blocking; run it off the event loop)"""
+        try:
+            with self.engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    lag = float(connection.execute(POSTGRES_LAG_SQL).scalar())
+                else:
+                    connection.execute(text("SELECT 1"))
+                    lag = 0.0
+        except (DBAPIError, OSError) as e:
+            self.mark_down(f"check failed: {e}")
+            return
+        
+        self.lag = lag
+        if lag > REPLICA_MAX_LAG_SECONDS:
+            self.mark_down(f"lag {lag:.1f}s exceeds {REPLICA_MAX_LAG_SECONDS:.1f}s")
+        elif not self.healthy:
+            logger.info("Replica %s is healthy (lag %.1fs)", self.name, lag)
+            self.healthy = True
+    
+    def mark_down(self, reason: str):
+        if self.healthy:
+            logger.warning("Replica %s taken out of rotation: %s", self.name, reason)
+        self.healthy = False
+
+class ReplicaSet:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self.counter = itertools.count()
+        self.task: Optional[asyncio.Task] = None
+    
+    def choose(self, request: Request) -> Optional[Replica]:
+        """The replica to serve a read from, or None for the primary"""
+        if request.method not in SAFE_METHODS or wrote_recently(request):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self.counter) % len(healthy)]
+    
+    async def check_all(self):
+        await asyncio.gather(*(asyncio.to_thread(replica.check) for replica in self.replicas))
+    
+    async def start(self):
+        """Check every replica once, then keep checking in the background"""
+        if not self.replicas:
+            return
+        await self.check_all()
+        self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(REPLICA_CHECK_INTERVAL)
+            await self.check_all()
+
+replicas = ReplicaSet(REPLICA_URLS)
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(WROTE_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+@asynccontextmanager
+async def open_read_session(request: Request):
+    """A session for a read-only request: a replica's, or else the primary's"""
+    replica = replicas.choose(request)
+    if replica is None:
+        async with open_session() as db:
+            yield db
+        return
+    
+    async with replica.open_session() as db:
+        yield db
+
+async def get_read_db(request: Request, primary = Depends(get_async_db)):
+    """Dependency for read-only endpoints: get_async_db, or a replica's session.
+    
+    Taking the primary session as a dependency means group lookups and the
+    endpoint share one session when the request stays on the primary.
+    """
+    replica = replicas.choose(request)
+    if replica is None:
+        yield primary
+        return
+    
+    async with replica.open_session() as db:
+        yield db
+
+class ReadYourWritesMiddleware:
+    """Mark clients that just wrote so their reads stay on the primary for a while"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{WROTE_COOKIE}={until:.3f}; Max-Age={READ_YOUR_WRITES_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,48 @@
+"""JSON responses encoded straight from plain dicts and lists.
+
+Routes build their payloads as plain dicts, without a Pydantic model per
+row, and return them in a `FastJSONResponse`, which FastAPI passes
+through without validating or re-encoding it. The typed `response_model`
+on each route still documents the shape in OpenAPI. orjson is used when
+installed; it encodes datetimes and UUIDs itself, so rows can keep them
+as they come from the database.
+"""
+import json
+import uuid
+from datetime import date
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode `content` as JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def api_response(
+    data: Optional[dict] = None, message: str = "", success: bool = True,
+    status_code: int = 200, headers: Optional[dict] = None
+) -> FastJSONResponse:
+    """The standard {success, data, message} envelope, ready to send"""
+    return FastJSONResponse(
+        {"success": success, "data": data, "message": message},
+        status_code=status_code,
+        headers=headers
+    )
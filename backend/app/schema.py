@@ -0,0 +1,59 @@
+"""The database schema is owned by the Alembic migrations in backend/migrations.
+
+The app never creates or alters tables itself: `python -m app.manage
+migrate` upgrades the database once per deploy, and the /ready endpoint
+reports whether the database is at the revision this code expects.
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .database import engine
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Any constant works; it only has to be the same for every migrating process
+MIGRATION_LOCK_KEY = 52_117_001
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+@lru_cache(maxsize=1)
+def head_revision() -> str:
+    """The newest migration shipped with this code"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(db: Session) -> Optional[str]:
+    """The migration the database is at; None if it has never been migrated"""
+    return MigrationContext.configure(db.connection()).get_current_revision()
+
+def upgrade():
+    """Migrate the database to head.
+
+    On Postgres an advisory lock serializes concurrent runs (say, several
+    replicas starting their migrate step at once): later ones wait, then
+    find nothing left to do.
+    """
+    config = alembic_config()
+    with engine.connect() as connection:
+        postgres = connection.dialect.name == "postgresql"
+        if postgres:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+        try:
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+            connection.commit()
+        finally:
+            if postgres:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
@@ -1,6 +1,26 @@
 from pydantic import BaseModel, validator
-from typing import List, Optional, Dict
-from datetime import datetime
+from typing import Generic, List, Optional, Dict, TypeVar
+from datetime import datetime, timezone
+import uuid
+
+from .money import from_cents, to_cents
+from .splits import SPLIT_TYPES, compute_shares
+
+class GroupCreate(BaseModel):
+    name: str
+    
+    @validator('name')
+    def validate_name(cls, v):
+        if not v or not v.strip():
+            raise ValueError('name cannot be empty')
+        return v.strip()
+
+class GroupResponse(GroupCreate):
+    id: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
 
 class ExpenseBase(BaseModel):
     amount: float
@@ -9,9 +29,15 @@ class ExpenseBase(BaseModel):
     
     @validator('amount')
     def validate_amount(cls, v):
-        if v <= 0:
+        cents = to_cents(v)
+        if cents <= 0:
             raise ValueError('Amount must be positive')
-        return round(v, 2)
+        # Rounded the way it is stored (half up), not with round()
+        return from_cents(cents)
+    
+    @property
+    def amount_cents(self) -> int:
+        return to_cents(self.amount)
     
     @validator('description')
     def validate_description(cls, v):
@@ -25,19 +51,67 @@ class ExpenseBase(BaseModel):
             raise ValueError('paid_by cannot be empty')
         return v.strip()
 
+class ShareInput(BaseModel):
+    person: str
+    # Amount, percentage or weight depending on split_type; unused for equal
+    value: Optional[float] = None
+    
+    @validator('person')
+    def validate_person(cls, v):
+        if not v or not v.strip():
+            raise ValueError('person cannot be empty')
+        return v.strip()
+
+class Share(BaseModel):
+    person: str
+    amount: float
+
+def validate_split(split_type: Optional[str], shares: Optional[List[ShareInput]], amount: Optional[float]):
+    """Check a split against `amount`; without an amount only its shape is checked"""
+    if split_type is not None and split_type not in SPLIT_TYPES:
+        raise ValueError(f"split_type must be one of {', '.join(SPLIT_TYPES)}")
+    if (split_type is None) != (shares is None):
+        raise ValueError('split_type and shares must be given together')
+    if shares is not None and amount is not None:
+        compute_shares(to_cents(amount), split_type, [(s.person, s.value) for s in shares])
+
 class ExpenseCreate(ExpenseBase):
-    pass
+    # Without a split the expense is shared evenly by the whole group
+    split_type: Optional[str] = None
+    shares: Optional[List[ShareInput]] = None
+    
+    @validator('shares', always=True)
+    def validate_shares(cls, v, values):
+        validate_split(values.get('split_type'), v, values.get('amount'))
+        return v
+    
+    @property
+    def share_cents(self) -> Optional[List[tuple]]:
+        """(person, cents owed) per participant, or None for an unsplit expense"""
+        if self.shares is None:
+            return None
+        return compute_shares(self.amount_cents, self.split_type, [(s.person, s.value) for s in self.shares])
 
 class ExpenseUpdate(BaseModel):
     amount: Optional[float] = None
     description: Optional[str] = None
     paid_by: Optional[str] = None
+    # Replaces the split; the new amount (or the current one) must fit it
+    split_type: Optional[str] = None
+    shares: Optional[List[ShareInput]] = None
     
     @validator('amount')
     def validate_amount(cls, v):
-        if v is not None and v <= 0:
+        if v is None:
+            return v
+        cents = to_cents(v)
+        if cents <= 0:
             raise ValueError('Amount must be positive')
-        return round(v, 2) if v is not None else v
+        return from_cents(cents)
+    
+    @property
+    def amount_cents(self) -> Optional[int]:
+        return to_cents(self.amount) if self.amount is not None else None
     
     @validator('description')
     def validate_description(cls, v):
@@ -50,9 +124,52 @@ class ExpenseUpdate(BaseModel):
         if v is not None and (not v or not v.strip()):
             raise ValueError('paid_by cannot be empty')
         return v.strip() if v is not None else v
+    
+    @validator('shares', always=True)
+    def validate_shares(cls, v, values):
+        validate_split(values.get('split_type'), v, values.get('amount'))
+        return v
+
+class ExpenseFilter(BaseModel):
+    """Optional conditions on an expense listing; all given ones must hold"""
+    # created_at range, since inclusive and until exclusive
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    paid_by: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    # Words that must all appear in the description
+    q: Optional[str] = None
+    
+    @validator('since', 'until')
+    def to_utc(cls, v):
+        # Timestamps are stored in UTC; a naive bound is taken to be UTC too
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone(timezone.utc)
+        return v.replace(tzinfo=timezone.utc) if v is not None else v
+    
+    @validator('paid_by', 'q')
+    def blank_to_none(cls, v):
+        return v.strip() or None if v is not None else v
+    
+    @validator('min_amount', 'max_amount')
+    def validate_bound(cls, v):
+        if v is not None:
+            to_cents(v)
+        return v
+    
+    @property
+    def min_amount_cents(self) -> Optional[int]:
+        return to_cents(self.min_amount) if self.min_amount is not None else None
+    
+    @property
+    def max_amount_cents(self) -> Optional[int]:
+        return to_cents(self.max_amount) if self.max_amount is not None else None
 
 class ExpenseResponse(ExpenseBase):
-    id: str
+    id: uuid.UUID
+    split_type: Optional[str] = None
+    shares: List[Share] = []
     created_at: datetime
     updated_at: datetime
     
@@ -70,9 +187,12 @@ class Settlement(BaseModel):
     to_person: str
     amount: float
 
-class APIResponse(BaseModel):
+T = TypeVar("T")
+
+class APIResponse(BaseModel, Generic[T]):
+    """Response envelope; parametrize it (APIResponse[ExpensesResponse]) to type `data`"""
     success: bool
-    data: Optional[Dict] = None
+    data: Optional[T] = None
     message: str
 
 class PeopleResponse(BaseModel):
@@ -82,9 +202,20 @@ class PeopleResponse(BaseModel):
 class ExpensesResponse(BaseModel):
     expenses: List[ExpenseResponse]
     count: int
+    next_cursor: Optional[str] = None
 
 class BalancesResponse(BaseModel):
     balances: List[Balance]
 
 class SettlementsResponse(BaseModel):
-    settlements: List[Settlement]
\ No newline at end of file
+    settlements: List[Settlement]
+
+class DashboardResponse(ExpensesResponse):
+    version: int
+    balances: List[Balance]
+    settlements: List[Settlement]
+
+class ImportResponse(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[Dict]
\ No newline at end of file
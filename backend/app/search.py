@@ -0,0 +1,62 @@
+"""Full-text search over expense descriptions.
+
+Postgres matches against a GIN index on ``to_tsvector('simple',
+description)``. SQLite keeps an external-content FTS5 index,
+``expenses_fts``, keyed by the expenses rowid and kept in step by
+triggers that touch only the changed row. Both use the 'simple' configuration (no
+stemming or stop words), so a query matches the same rows on either
+database: every word of it must appear in the description. Other
+databases fall back to a substring scan.
+
+The DDL is attached to the expenses table here for `create_all` (the
+benchmarks build throwaway databases that way); the same statements live
+in migration 0008.
+
+``expenses`` has no INTEGER PRIMARY KEY, so VACUUM (or a migration that
+copies the table) may renumber its rowids; rebuild the index afterwards
+with ``INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild')``.
+"""
+from sqlalchemy import DDL, Integer, event, func, literal_column, text
+
+from .models import Expense
+
+POSTGRES_DDL = [
+    "CREATE INDEX IF NOT EXISTS idx_expenses_description_fts ON expenses"
+    " USING gin (to_tsvector('simple', description))",
+]
+
+# Index rows are removed with FTS5's 'delete' command, which is keyed by
+# rowid and must be given the old text
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5("
+    "description, content='expenses', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_insert AFTER INSERT ON expenses BEGIN"
+    " INSERT INTO expenses_fts (rowid, description) VALUES (NEW.rowid, NEW.description); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_update AFTER UPDATE OF description ON expenses BEGIN"
+    " INSERT INTO expenses_fts (expenses_fts, rowid, description) VALUES ('delete', OLD.rowid, OLD.description);"
+    " INSERT INTO expenses_fts (rowid, description) VALUES (NEW.rowid, NEW.description); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_delete AFTER DELETE ON expenses BEGIN"
+    " INSERT INTO expenses_fts (expenses_fts, rowid, description) VALUES ('delete', OLD.rowid, OLD.description); END",
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(Expense.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(Expense.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+def fts5_query(q: str) -> str:
+    """Quote every word so user input is never read as FTS5 syntax"""
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in q.split())
+
+def description_matches(dialect_name: str, q: str):
+    """A WHERE clause matching expenses whose description contains every word of `q`"""
+    if dialect_name == "postgresql":
+        return func.to_tsvector("simple", Expense.description).op("@@")(func.plainto_tsquery("simple", q))
+    if dialect_name == "sqlite":
+        matching = (
+            text("SELECT rowid FROM expenses_fts WHERE expenses_fts MATCH :fts_query")
+            .bindparams(fts_query=fts5_query(q))
+            .columns(rowid=Integer)
+        )
+        return literal_column("expenses.rowid").in_(matching.scalar_subquery())
+    return Expense.description.ilike(f"%{q}%")
@@ -0,0 +1,165 @@
+"""Settlement solvers.
+
+Both solvers take net balances in cents, `(person, balance)` with
+positive meaning "is owed money", summing to zero, and return transfers
+as `(from_person, to_person, cents)`.
+
+- `greedy` repeatedly matches the largest creditor with the largest
+  debtor. It is O(n log n) and needs at most n - 1 transfers.
+- `optimal` finds the fewest transfers. A group of k people whose
+  balances sum to zero can always settle in k - 1 transfers, so the
+  minimum is n - (maximum number of disjoint zero-sum subsets). It
+  enumerates the zero-sum subsets by meet-in-the-middle, finds the
+  longest chain of nested ones with a memoized DP over bitmasks, and
+  settles each resulting subset greedily. Exponential in the worst case,
+  so it runs against a wall-clock budget and falls back to `greedy`.
+"""
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+Transfer = Tuple[str, str, int]
+
+# Wall-clock budget for the optimal solver before falling back to greedy
+OPTIMAL_BUDGET_SECONDS = float(os.getenv("SETTLEMENT_OPTIMAL_BUDGET_MS", "200")) / 1000
+
+# Above this many non-zero balances the subset enumeration is not attempted
+OPTIMAL_MAX_PEOPLE = 32
+
+class BudgetExceeded(Exception):
+    pass
+
+def greedy(balances: List[Tuple[str, int]]) -> List[Transfer]:
+    """Match the largest creditor with the largest debtor until all are settled"""
+    # Separate creditors (positive balance) and debtors (negative balance)
+    creditors = [(person, amount) for person, amount in balances if amount > 0]
+    debtors = [(person, -amount) for person, amount in balances if amount < 0]
+    
+    # Sort creditors and debtors by amount (largest first)
+    creditors.sort(key=lambda x: x[1], reverse=True)
+    debtors.sort(key=lambda x: x[1], reverse=True)
+    
+    transfers = []
+    i, j = 0, 0
+    while i < len(creditors) and j < len(debtors):
+        creditor, credit_amount = creditors[i]
+        debtor, debt_amount = debtors[j]
+        
+        amount = min(credit_amount, debt_amount)
+        transfers.append((debtor, creditor, amount))
+        
+        # Update remaining amounts
+        creditors[i] = (creditor, credit_amount - amount)
+        debtors[j] = (debtor, debt_amount - amount)
+        
+        # Move to next creditor or debtor
+        if creditors[i][1] == 0:
+            i += 1
+        if debtors[j][1] == 0:
+            j += 1
+    
+    return transfers
+
+def _check(deadline: float):
+    if time.perf_counter() > deadline:
+        raise BudgetExceeded
+
+def _half_sums(amounts: List[int], offset: int, deadline: float) -> Dict[int, List[int]]:
+    """Map subset sum -> bitmasks (shifted by `offset`) for every subset of `amounts`"""
+    sums = [0] * (1 << len(amounts))
+    for mask in range(1, len(sums)):
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + amounts[low.bit_length() - 1]
+        if mask & 0xFFF == 0:
+            _check(deadline)
+    by_sum = defaultdict(list)
+    for mask, total in enumerate(sums):
+        by_sum[total].append(mask << offset)
+    return by_sum
+
+def _zero_sum_masks(amounts: List[int], deadline: float) -> List[int]:
+    """All bitmasks over `amounts` whose subset sums to zero (meet in the middle)"""
+    split = len(amounts) // 2
+    left = _half_sums(amounts[:split], 0, deadline)
+    right = _half_sums(amounts[split:], split, deadline)
+    masks = []
+    for total, left_masks in left.items():
+        right_masks = right.get(-total)
+        if not right_masks:
+            continue
+        for left_mask in left_masks:
+            masks.extend(left_mask | right_mask for right_mask in right_masks)
+        _check(deadline)
+    return masks
+
+def _max_zero_sum_partition(amounts: List[int], deadline: float) -> List[int]:
+    """Split indices into the most disjoint zero-sum subsets; return their bitmasks"""
+    full = (1 << len(amounts)) - 1
+    masks = sorted(_zero_sum_masks(amounts, deadline), key=lambda m: bin(m).count("1"))
+    
+    # best[mask] = longest chain of nested zero-sum masks ending at `mask`
+    best = {0: 0}
+    previous = {0: None}
+    for mask in masks:
+        if mask == 0:
+            continue
+        best_len, best_prev = 0, 0
+        for candidate, length in best.items():
+            if candidate & mask == candidate and candidate != mask and length + 1 > best_len:
+                best_len, best_prev = length + 1, candidate
+        best[mask] = best_len
+        previous[mask] = best_prev
+        _check(deadline)
+    
+    groups = []
+    mask = full
+    while mask:
+        groups.append(mask ^ previous[mask])
+        mask = previous[mask]
+    return groups
+
+def optimal(balances: List[Tuple[str, int]], budget: float = OPTIMAL_BUDGET_SECONDS) -> List[Transfer]:
+    """Settle with the fewest transfers, or fall back to greedy past `budget` seconds"""
+    deadline = time.perf_counter() + budget
+    
+    # Someone owed exactly what someone else owes always forms its own
+    # group in some optimal solution, so pair those off up front
+    transfers = []
+    unmatched = defaultdict(list)
+    remaining = []
+    for person, amount in sorted(balances, key=lambda b: b[0]):
+        if amount == 0:
+            continue
+        partners = unmatched[-amount]
+        if partners:
+            partner = partners.pop()
+            debtor, creditor = (person, partner) if amount < 0 else (partner, person)
+            transfers.append((debtor, creditor, abs(amount)))
+        else:
+            unmatched[amount].append(person)
+    for amount, people in unmatched.items():
+        remaining.extend((person, amount) for person in people)
+    
+    if len(remaining) > OPTIMAL_MAX_PEOPLE:
+        logger.info("optimal settlement skipped for %d people; using greedy", len(remaining))
+        return greedy(balances)
+    
+    try:
+        groups = _max_zero_sum_partition([amount for _, amount in remaining], deadline)
+    except BudgetExceeded:
+        logger.info("optimal settlement exceeded %.0f ms budget; using greedy", budget * 1000)
+        return greedy(balances)
+    
+    for group in groups:
+        members = [remaining[i] for i in range(len(remaining)) if group >> i & 1]
+        transfers.extend(greedy(members))
+    return transfers
+
+SOLVERS = {
+    "greedy": greedy,
+    "optimal": optimal,
+}
@@ -0,0 +1,58 @@
+"""How an expense is divided between the people who share it.
+
+An expense without a split is shared evenly by everyone in the group (the
+original behaviour). An expense with a split names its participants and
+owes them fixed shares, computed here once at write time and stored in
+`expense_shares`, so balances never re-derive them per expense:
+
+- equal:      the amount is divided evenly between the participants
+- exact:      each participant's value is their amount; they must add up
+- percentage: each value is a percentage; they must add up to 100
+- weight:     the amount is divided in proportion to the values
+"""
+from decimal import Decimal
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from .money import to_cents, allocate, split_evenly
+
+SPLIT_TYPES = ("equal", "exact", "percentage", "weight")
+
+def compute_shares(
+    amount_cents: int, split_type: str, participants: Sequence[Tuple[str, Optional[float]]]
+) -> List[Tuple[str, int]]:
+    """Turn (person, value) pairs into (person, cents owed) that add up to `amount_cents`.
+
+    Raises ValueError if the split is malformed.
+    """
+    if split_type not in SPLIT_TYPES:
+        raise ValueError(f"split_type must be one of {', '.join(SPLIT_TYPES)}")
+    if not participants:
+        raise ValueError("A split needs at least one participant")
+    people = [person for person, _ in participants]
+    if len(set(people)) != len(people):
+        raise ValueError("Each participant may appear only once")
+    
+    if split_type == "equal":
+        return list(zip(people, split_evenly(amount_cents, len(people))))
+    
+    values = [value for _, value in participants]
+    if any(value is None for value in values):
+        raise ValueError(f"Every participant in a {split_type} split needs a value")
+    if not all(math.isfinite(value) for value in values):
+        raise ValueError("Split values must be finite numbers")
+    if any(value < 0 for value in values):
+        raise ValueError("Split values cannot be negative")
+    
+    if split_type == "exact":
+        cents = [to_cents(value) for value in values]
+        if sum(cents) != amount_cents:
+            raise ValueError("Exact shares must add up to the amount")
+        return list(zip(people, cents))
+    
+    weights = [Decimal(str(value)) for value in values]
+    if split_type == "percentage" and sum(weights) != 100:
+        raise ValueError("Percentages must add up to 100")
+    if sum(weights) == 0:
+        raise ValueError("Weights must not all be zero")
+    return list(zip(people, allocate(amount_cents, weights)))
@@ -0,0 +1,7 @@
+import os
+
+# Benchmarks run against BENCHMARK_DATABASE_URL, never the app's own
+# DATABASE_URL (in the containers that is the real database, and some
+# benchmarks drop every table). It defaults to a throwaway SQLite file;
+# point it at a scratch Postgres database to measure the production setup.
+os.environ["DATABASE_URL"] = os.getenv("BENCHMARK_DATABASE_URL", "sqlite:////tmp/splitapp_bench.db")
@@ -0,0 +1,63 @@
+"""Compare balance paths: ORM rows, GROUP BY aggregate and the ledger table.
+
+    python -m benchmarks.balances --expenses 100000 --people 20
+"""
+import argparse
+from collections import defaultdict
+
+from app.crud import aggregate_expenses, get_balances
+from app.money import from_cents, split_evenly
+from app.models import Expense, DEFAULT_GROUP_ID
+
+from .common import reset_database, seed_expenses, session, timed
+
+
+def legacy_balances(db):
+    """The original implementation: load every Expense row into Python"""
+    expenses = db.query(Expense).filter(Expense.group_id == DEFAULT_GROUP_ID).all()
+    total_paid = defaultdict(int)
+    total_expenses = 0
+    for expense in expenses:
+        total_paid[expense.paid_by] += expense.amount_cents
+        total_expenses += expense.amount_cents
+    people = sorted(
+        p for (p,) in db.query(Expense.paid_by).filter(Expense.group_id == DEFAULT_GROUP_ID).distinct()
+    )
+    shares = split_evenly(total_expenses, len(people))
+    return {
+        person: from_cents(total_paid[person] - share)
+        for person, share in zip(people, shares)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--people", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    reset_database()
+    db = session()
+    try:
+        seed_expenses(db, args.expenses, args.people)
+
+        legacy_time, legacy = timed(lambda: legacy_balances(db), args.repeat)
+        db.expire_all()
+        aggregate_time, _ = timed(lambda: aggregate_expenses(db, DEFAULT_GROUP_ID), args.repeat)
+        ledger_time, balances = timed(lambda: get_balances(db, DEFAULT_GROUP_ID), args.repeat)
+
+        ledger = {b.person: b.balance for b in balances}
+        assert ledger.keys() == legacy.keys()
+        assert ledger == legacy
+
+        print(f"expenses={args.expenses} people={args.people}")
+        print(f"  ORM rows   : {legacy_time * 1000:9.2f} ms")
+        print(f"  GROUP BY   : {aggregate_time * 1000:9.2f} ms")
+        print(f"  ledger     : {ledger_time * 1000:9.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks talk to whatever ``BENCHMARK_DATABASE_URL`` points at (a
+throwaway SQLite file by default), e.g.::
+
+    BENCHMARK_DATABASE_URL=sqlite:////tmp/splitapp_bench.db python -m benchmarks.balances
+
+Most of them start from `reset_database`, which only touches databases
+the migrations have never been run on.
+"""
+import statistics
+import time
+
+from sqlalchemy import inspect, text
+
+from app.database import engine, SessionLocal
+from app.models import Base
+
+from .generator import load
+
+
+def reset_database():
+    """Drop and recreate every table of a scratch benchmark database.
+
+    A database with an ``alembic_version`` table belongs to the app (the
+    migrations created it), so it is never reset.
+    """
+    if inspect(engine).has_table("alembic_version"):
+        raise SystemExit(
+            f"refusing to reset {engine.url.render_as_string(hide_password=True)}: it is managed "
+            "by the migrations; set BENCHMARK_DATABASE_URL to a scratch database"
+        )
+    Base.metadata.drop_all(bind=engine)
+    if engine.dialect.name == "sqlite":
+        # The FTS5 index is not in the metadata, so drop_all leaves its rows behind
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS expenses_fts"))
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_expenses(db, num_expenses: int, num_people: int, seed: int = 42, batch_size: int = 10_000):
+    """Insert ``num_expenses`` generated expenses paid by ``num_people`` people
+    into the default group; none are split, so balances are even shares"""
+    load(db, num_expenses, num_people, seed, batch_size=batch_size, split_ratio=0)
+
+
+def timed(fn, repeat: int = 5):
+    """Run ``fn`` ``repeat`` times, return (median seconds, last result)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def session():
+    return SessionLocal()
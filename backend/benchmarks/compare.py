@@ -0,0 +1,52 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.micro --json before.json      # on the old commit
+    python -m benchmarks.micro --json after.json       # on the new one
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Cases are compared on one latency statistic (``--stat``, p50 by
+default). A case slower by more than ``--threshold`` percent is a
+regression, and the exit status is 1 if there is any.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--stat", default="p50_ms", choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline["params"] != candidate["params"] or baseline["database"] != candidate["database"]:
+        print("warning: the runs used different parameters or databases", file=sys.stderr)
+
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')} ({args.stat})")
+    print(f"  {'case':<28} {'before':>9} {'after':>9} {'change':>8}")
+    regressions = []
+    for name, before in baseline["results"].items():
+        after = candidate["results"].get(name)
+        if after is None:
+            print(f"  {name:<28} {before[args.stat]:9.2f} {'-':>9} {'missing':>8}")
+            continue
+        change = (after[args.stat] - before[args.stat]) / before[args.stat] * 100 if before[args.stat] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<28} {before[args.stat]:9.2f} {after[args.stat]:9.2f} {change:+7.1f}%{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Seeded synthetic ledgers for benchmarks.
+
+    python -m benchmarks.generator --expenses 100000 --people 20 --reset
+
+loads ``BENCHMARK_DATABASE_URL`` (SQLite or Postgres) with a reproducible group:
+the same seed always gives the same rows. The shape follows real shared
+expenses rather than uniform noise:
+
+- amounts are log-normal around a per-category median (coffee is cheap,
+  rent is not) and mostly whole or round numbers;
+- a few people pay for most things (Zipf-weighted payers);
+- expenses are spread over ``--days`` in time order, with UUIDv7-style
+  ids as the app generates them;
+- ``--split-ratio`` of expenses have an equal or weighted split among a
+  few people instead of being shared by the whole group.
+
+Rows go in with bulk inserts, then the person_balances ledger is rebuilt.
+"""
+import argparse
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Tuple
+
+from app.crud import ensure_default_group, make_shares, rebuild_ledger
+from app.models import Expense, ExpenseShare, Group, DEFAULT_GROUP_ID
+
+# (description, median amount in cents, relative frequency)
+CATEGORIES = [
+    ("Coffee", 250_00, 12),
+    ("Groceries", 1_800_00, 20),
+    ("Dinner", 2_400_00, 15),
+    ("Lunch", 900_00, 12),
+    ("Taxi", 450_00, 14),
+    ("Fuel", 2_000_00, 8),
+    ("Movie tickets", 800_00, 5),
+    ("Electricity bill", 3_500_00, 3),
+    ("Internet bill", 1_000_00, 3),
+    ("Rent", 25_000_00, 2),
+    ("Hotel", 8_000_00, 3),
+    ("Flight tickets", 15_000_00, 3),
+]
+PLACES = ["", " at Pizza Place", " at the airport", " downtown", " with friends", " for the trip"]
+
+
+def make_id(rng: random.Random, created_at: datetime) -> uuid.UUID:
+    """A UUIDv7 for `created_at` with seeded random bits"""
+    millis = int(created_at.timestamp() * 1000)
+    value = millis << 80 | rng.getrandbits(80)
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
+
+
+def make_amount(rng: random.Random, median_cents: int) -> int:
+    cents = max(100, min(int(rng.lognormvariate(math.log(median_cents), 0.6)), 10_000_000_00))
+    roll = rng.random()
+    if roll < 0.6:
+        return max(100, round(cents, -2))
+    if roll < 0.8:
+        return max(5_000, round(cents / 5_000) * 5_000)
+    return cents
+
+
+def generate(
+    num_expenses: int, num_people: int, seed: int = 42, group_id: str = DEFAULT_GROUP_ID,
+    days: int = 365, split_ratio: float = 0.2
+) -> Iterator[Tuple[dict, List[dict]]]:
+    """Yield (expense row, share rows) pairs, oldest expense first"""
+    rng = random.Random(seed)
+    people = [f"person_{i:03d}" for i in range(num_people)]
+    payer_weights = [1 / (rank + 1) ** 1.1 for rank in range(num_people)]
+    category_weights = [weight for _, _, weight in CATEGORIES]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    step = timedelta(days=days) / max(num_expenses, 1)
+
+    for i in range(num_expenses):
+        created_at = start + step * i + timedelta(milliseconds=rng.randrange(1000))
+        description, median_cents, _ = rng.choices(CATEGORIES, category_weights)[0]
+        amount_cents = make_amount(rng, median_cents)
+        paid_by = rng.choices(people, payer_weights)[0]
+        row = {
+            "id": make_id(rng, created_at),
+            "group_id": group_id,
+            "amount_cents": amount_cents,
+            "description": description + rng.choice(PLACES),
+            "paid_by": paid_by,
+            "split_type": None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+        shares = []
+        if num_people > 1 and rng.random() < split_ratio:
+            others = rng.sample([p for p in people if p != paid_by], min(num_people - 1, rng.randint(1, 4)))
+            if rng.random() < 0.7:
+                row["split_type"] = "equal"
+                participants = [(person, None) for person in [paid_by] + others]
+            else:
+                row["split_type"] = "weight"
+                participants = [(person, float(rng.randint(1, 3))) for person in [paid_by] + others]
+            shares = [
+                {
+                    "expense_id": row["id"], "person": share.person, "group_id": group_id,
+                    "amount_cents": share.amount_cents, "value": share.value,
+                }
+                for share in make_shares(group_id, amount_cents, row["split_type"], participants)
+            ]
+        yield row, shares
+
+
+def load(db, num_expenses: int, num_people: int, seed: int = 42, group_id: str = DEFAULT_GROUP_ID,
+         batch_size: int = 10_000, **options) -> int:
+    """Insert a generated ledger into ``group_id`` and rebuild its balances"""
+    if group_id == DEFAULT_GROUP_ID:
+        ensure_default_group(db)
+    elif db.get(Group, group_id) is None:
+        db.add(Group(id=group_id, name=group_id))
+        db.commit()
+
+    expenses, shares = [], []
+    for row, share_rows in generate(num_expenses, num_people, seed, group_id, **options):
+        expenses.append(row)
+        shares.extend(share_rows)
+        if len(expenses) >= batch_size:
+            db.bulk_insert_mappings(Expense, expenses)
+            db.bulk_insert_mappings(ExpenseShare, shares)
+            expenses, shares = [], []
+    if expenses:
+        db.bulk_insert_mappings(Expense, expenses)
+        db.bulk_insert_mappings(ExpenseShare, shares)
+    db.commit()
+    # Bulk inserts bypass crud, so bring the person_balances ledger in line
+    return rebuild_ledger(db, group_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--people", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--group", default=DEFAULT_GROUP_ID)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--split-ratio", type=float, default=0.2)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    args = parser.parse_args()
+
+    from .common import reset_database, session
+
+    if args.reset:
+        reset_database()
+    db = session()
+    try:
+        people = load(
+            db, args.expenses, args.people, args.seed, args.group,
+            days=args.days, split_ratio=args.split_ratio
+        )
+        print(f"loaded {args.expenses} expenses, {people} ledger rows into group {args.group!r}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Expenses/sec with a commit per row versus the group-commit writer.
+
+    python -m benchmarks.group_commit --expenses 5000 --concurrency 100
+
+Concurrent producers create expenses the way POST /expenses does: either
+each in its own transaction (create_expense) or through a
+GroupCommitWriter. Run it with several --delay-ms values to see the
+latency/throughput trade-off.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app.crud import check_ledger, create_expense, ensure_default_group
+from app.database import open_session
+from app.group_commit import GroupCommitWriter
+from app.models import DEFAULT_GROUP_ID
+from app.schemas import ExpenseCreate
+
+from .common import reset_database, session
+
+
+async def per_row(group_id, expense):
+    async with open_session() as db:
+        return await db.run_sync(create_expense, group_id, expense)
+
+
+async def run(create, total, concurrency):
+    """Return (expenses/sec, per-request latencies in seconds, failed writes)"""
+    latencies = []
+    failed = 0
+    per_worker = total // concurrency
+
+    async def worker(n):
+        nonlocal failed
+        for i in range(per_worker):
+            expense = ExpenseCreate(amount=10 + i % 90, description=f"item {n}-{i}", paid_by=f"person_{n % 20:02d}")
+            start = time.perf_counter()
+            try:
+                await create(DEFAULT_GROUP_ID, expense)
+            except OperationalError:
+                # SQLite gives up on writers that wait too long for the lock
+                failed += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return len(latencies) / (time.perf_counter() - start), latencies, failed
+
+
+def report(label, rate, latencies, failed):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"  {label:<22}: {rate:9.0f} expenses/s   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   failed {failed}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expenses", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--delay-ms", type=float, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+
+    reset_database()
+    db = session()
+    ensure_default_group(db)
+    db.close()
+
+    print(f"expenses={args.expenses} concurrency={args.concurrency}")
+    report("commit per row", *await run(per_row, args.expenses, args.concurrency))
+    for delay_ms in args.delay_ms:
+        writer = GroupCommitWriter(delay_ms / 1000, args.rows)
+        result = await run(writer.submit, args.expenses, args.concurrency)
+        await writer.close()
+        report(f"group commit {delay_ms:g} ms", *result)
+
+    db = session()
+    assert check_ledger(db) == []
+    db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
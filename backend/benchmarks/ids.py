@@ -0,0 +1,66 @@
+"""Insert rate and primary key index size: random uuid4 versus time-ordered uuid7.
+
+    python -m benchmarks.ids --rows 200000
+
+Each variant fills its own table, shaped like `expenses`' key, in
+committed batches. Random keys land on arbitrary index pages and split
+them half-full; time-ordered keys always append at the right edge.
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import Column, MetaData, String, Table, Uuid, insert, text
+
+from app.database import engine
+from app.models import uuid7
+
+
+def index_bytes(conn, table):
+    if conn.dialect.name == "postgresql":
+        return conn.execute(text(f"SELECT pg_relation_size('{table}_pkey')")).scalar()
+    # SQLite: count the pages of the primary key's automatic index
+    try:
+        return conn.execute(text(
+            f"SELECT sum(pgsize) FROM dbstat WHERE name = 'sqlite_autoindex_{table}_1'"
+        )).scalar()
+    except Exception:
+        return None
+
+
+def fill(table, make_id, rows, batch_size):
+    metadata = MetaData()
+    bench = Table(
+        table, metadata,
+        Column("id", Uuid, primary_key=True),
+        Column("payload", String, nullable=False),
+    )
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch = [{"id": make_id(), "payload": "x" * 40} for _ in range(min(batch_size, rows - offset))]
+        with engine.begin() as conn:
+            conn.execute(insert(bench), batch)
+    elapsed = time.perf_counter() - start
+    with engine.connect() as conn:
+        size = index_bytes(conn, table)
+    metadata.drop_all(engine)
+    return rows / elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"rows={args.rows} batch={args.batch_size} dialect={engine.dialect.name}")
+    for label, make_id in [("uuid4", uuid.uuid4), ("uuid7", uuid7)]:
+        rate, size = fill(f"bench_ids_{label}", make_id, args.rows, args.batch_size)
+        size_text = f"{size / 1024 / 1024:8.2f} MiB" if size else "     n/a"
+        print(f"  {label}: {rate:10.0f} rows/s   pk index {size_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Hammer a running server with concurrent clients and report throughput.
+
+Start the server twice, once per DB mode, and compare:
+
+    DB_ASYNC=1 uvicorn app.main:app --port 8000
+    python -m benchmarks.load_test --url http://localhost:8000 --clients 200
+
+    DB_ASYNC=0 uvicorn app.main:app --port 8000
+    python -m benchmarks.load_test --url http://localhost:8000 --clients 200
+
+Load the server's database first for realistic sizes, e.g.
+``python -m benchmarks.generator --expenses 100000 --reset``.
+``--write-ratio`` mixes in expense creation (generated payloads);
+``--json`` writes per-path latency percentiles for benchmarks.compare.
+
+Requires httpx (pip install -r benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+import httpx
+
+from .generator import CATEGORIES, make_amount
+from .results import print_table, report, summarize, write_report
+
+DEFAULT_PATHS = ["/api/expenses", "/api/balances", "/api/settlements"]
+WRITE = "POST /api/expenses"
+
+
+def expense_payload(rng, people):
+    description, median_cents, _ = rng.choice(CATEGORIES)
+    return {
+        "amount": make_amount(rng, median_cents) / 100,
+        "description": description,
+        "paid_by": rng.choice(people),
+    }
+
+
+async def client_loop(client, paths, deadline, latencies, errors, rng, write_ratio, people):
+    i = 0
+    while time.perf_counter() < deadline:
+        if rng.random() < write_ratio:
+            name = WRITE
+            request = client.post("/api/expenses", json=expense_payload(rng, people))
+        else:
+            name = paths[i % len(paths)]
+            i += 1
+            request = client.get(name)
+        start = time.perf_counter()
+        try:
+            response = await request
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors[name] += 1
+            continue
+        latencies[name].append(time.perf_counter() - start)
+
+
+async def run(url, clients, duration, paths, write_ratio=0.0, people=20, seed=42):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    rng = random.Random(seed)
+    names = [f"person_{i:03d}" for i in range(people)]
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            client_loop(
+                client, paths, deadline, latencies, errors,
+                random.Random(rng.random()), write_ratio, names
+            )
+            for _ in range(clients)
+        ))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--path", action="append", dest="paths", help="repeatable; defaults to the dashboard reads")
+    parser.add_argument("--write-ratio", type=float, default=0.0, help="fraction of requests that create an expense")
+    parser.add_argument("--people", type=int, default=20, help="payers for created expenses")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    latencies, errors = asyncio.run(run(
+        args.url, args.clients, args.duration, paths, args.write_ratio, args.people, args.seed
+    ))
+    every = [latency for samples in latencies.values() for latency in samples]
+    results = {"all": summarize(every)}
+    results.update((name, summarize(samples)) for name, samples in sorted(latencies.items()))
+
+    print(f"clients={args.clients} duration={args.duration}s write_ratio={args.write_ratio}")
+    print(f"  requests   : {len(every)} ok, {sum(errors.values())} failed")
+    print(f"  throughput : {len(every) / args.duration:9.1f} req/s")
+    print_table(results)
+
+    params = {
+        "url": args.url, "clients": args.clients, "duration": args.duration, "paths": paths,
+        "write_ratio": args.write_ratio, "seed": args.seed,
+    }
+    for name, stats in results.items():
+        stats["throughput_rps"] = stats["runs"] / args.duration
+        stats["errors"] = sum(errors.values()) if name == "all" else errors.get(name, 0)
+    # The database belongs to the server, so it is not known here
+    write_report(args.json, report("load_test", params, results, database="server"))
+
+
+if __name__ == "__main__":
+    main()
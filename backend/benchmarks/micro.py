@@ -0,0 +1,100 @@
+"""Latency of the crud read paths on a generated ledger.
+
+    python -m benchmarks.micro --expenses 100000 --people 20 --json micro.json
+
+Seeds a fresh database (see benchmarks.generator), then times balances,
+settlements (greedy and optimal) and expense listings: the first page, a
+deep page by cursor and by the deprecated OFFSET, and filtered pages.
+Each case runs ``--repeat`` times after one warm-up call; ``--json``
+writes the summary for benchmarks.compare.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from sqlalchemy import func
+
+from app.crud import calculate_settlements, get_balances, get_expenses, get_expenses_page
+from app.models import Expense, DEFAULT_GROUP_ID
+from app.pagination import encode_cursor
+from app.schemas import ExpenseFilter
+
+from .common import reset_database, session
+from .generator import load
+from .results import print_table, report, summarize, write_report
+
+
+def cases(db, num_expenses: int):
+    """name -> zero-argument callable"""
+    group_id = DEFAULT_GROUP_ID
+    middle = (
+        db.query(Expense.created_at, Expense.id)
+        .filter(Expense.group_id == group_id)
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
+        .offset(num_expenses // 2)
+        .first()
+    )
+    cursor = encode_cursor(*middle) if middle else None
+    latest = db.query(func.max(Expense.created_at)).filter(Expense.group_id == group_id).scalar()
+    # The generator's most frequent payer, over the last 30 days
+    payer_month = ExpenseFilter(paid_by="person_000", since=latest - timedelta(days=30))
+
+    return {
+        "get_balances": lambda: get_balances(db, group_id),
+        "settlements_greedy": lambda: calculate_settlements(db, group_id, "greedy"),
+        "settlements_optimal": lambda: calculate_settlements(db, group_id, "optimal"),
+        "expenses_first_page": lambda: get_expenses_page(db, group_id, None, 100),
+        "expenses_deep_cursor": lambda: get_expenses_page(db, group_id, cursor, 100),
+        "expenses_deep_offset": lambda: get_expenses(db, group_id, skip=num_expenses // 2, limit=100),
+        "expenses_payer_month": lambda: get_expenses_page(db, group_id, None, 100, payer_month),
+        "expenses_search": lambda: get_expenses_page(db, group_id, None, 100, ExpenseFilter(q="pizza")),
+    }
+
+
+def run_case(db, fn, repeat: int):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        # Measure the query, not the identity map
+        db.expunge_all()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--people", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--split-ratio", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--case", action="append", dest="cases", help="repeatable; defaults to every case")
+    parser.add_argument("--json", help="write results to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    reset_database()
+    db = session()
+    try:
+        load(db, args.expenses, args.people, args.seed, split_ratio=args.split_ratio)
+        selected = cases(db, args.expenses)
+        results = {
+            name: run_case(db, fn, args.repeat)
+            for name, fn in selected.items()
+            if not args.cases or name in args.cases
+        }
+    finally:
+        db.close()
+
+    params = {
+        "expenses": args.expenses, "people": args.people, "seed": args.seed,
+        "split_ratio": args.split_ratio, "repeat": args.repeat,
+    }
+    print(" ".join(f"{key}={value}" for key, value in params.items()))
+    print_table(results)
+    write_report(args.json, report("micro", params, results))
+
+
+if __name__ == "__main__":
+    main()
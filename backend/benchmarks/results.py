@@ -0,0 +1,80 @@
+"""Machine-readable benchmark results.
+
+Each run is one JSON document::
+
+    {"benchmark": "micro", "commit": "d9e6b3a", "database": "sqlite",
+     "timestamp": "...", "params": {...},
+     "results": {"get_balances": {"runs": 20, "mean_ms": ..., "p50_ms": ...}}}
+
+so two runs (say, before and after a change) can be diffed with
+``python -m benchmarks.compare old.json new.json``.
+"""
+import json
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.database import engine
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds of a list of durations in seconds"""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean_ms": statistics.mean(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(benchmark: str, params: dict, results: Dict[str, dict], database: Optional[str] = None) -> dict:
+    return {
+        "benchmark": benchmark,
+        "commit": current_commit(),
+        "database": database or engine.dialect.name,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "params": params,
+        "results": results,
+    }
+
+
+def write_report(path: Optional[str], document: dict):
+    """Write a report to ``path`` ("-" for stdout); nothing if path is None"""
+    if path is None:
+        return
+    text = json.dumps(document, indent=2, sort_keys=True)
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+
+
+def print_table(results: Dict[str, dict]):
+    print(f"  {'case':<28} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, stats in results.items():
+        print(
+            f"  {name:<28} {stats['runs']:>5} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} "
+            f"{stats['p99_ms']:9.2f} {stats['max_ms']:9.2f}"
+        )
@@ -0,0 +1,93 @@
+"""Serialization cost of one page of expenses, before and after the fast path.
+
+    python -m benchmarks.serialization --rows 10000
+
+- legacy: per-row dicts with isoformat(), wrapped in the untyped
+  APIResponse, then jsonable_encoder + json.dumps as FastAPI does for a
+  returned model
+- typed model: the same page validated into APIResponse[ExpensesResponse]
+  and dumped by Pydantic (FastAPI's response_model path)
+- fast path: expense_to_dict rows encoded directly by FastJSONResponse
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.expenses import expense_to_dict
+from app.models import uuid7
+from app.money import from_cents
+from app.responses import FastJSONResponse, orjson
+from app.schemas import APIResponse, ExpensesResponse
+
+from .common import timed
+
+
+def make_rows(count, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=uuid7(),
+            amount_cents=rng.randint(100, 500_000),
+            description=f"expense {i}",
+            paid_by=f"person_{rng.randrange(20):02d}",
+            split_type=None,
+            shares=[],
+            created_at=start + timedelta(seconds=i),
+            updated_at=start + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def legacy(rows):
+    expenses = [
+        {
+            "id": str(row.id),
+            "amount": from_cents(row.amount_cents),
+            "description": row.description,
+            "paid_by": row.paid_by,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat()
+        }
+        for row in rows
+    ]
+    response = APIResponse(success=True, data={"expenses": expenses, "count": len(expenses)}, message="ok")
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+def typed_model(rows):
+    expenses = [expense_to_dict(row) for row in rows]
+    response = APIResponse[ExpensesResponse].model_validate(
+        {"success": True, "data": {"expenses": expenses, "count": len(expenses)}, "message": "ok"}
+    )
+    return response.model_dump_json().encode()
+
+
+def fast_path(rows):
+    expenses = [expense_to_dict(row) for row in rows]
+    response = FastJSONResponse(
+        {"success": True, "data": {"expenses": expenses, "count": len(expenses)}, "message": "ok"}
+    )
+    return response.body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"rows={args.rows} encoder={'orjson' if orjson else 'json'}")
+    for label, fn in [("legacy", legacy), ("typed model", typed_model), ("fast path", fast_path)]:
+        seconds, body = timed(lambda: fn(rows), args.repeat)
+        print(f"  {label:<12}: {seconds * 1000:8.2f} ms   {len(body) / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
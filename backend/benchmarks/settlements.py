@@ -0,0 +1,61 @@
+"""Transfer count and latency of the greedy and optimal settlement solvers.
+
+    python -m benchmarks.settlements --trials 20
+
+"random" balances are arbitrary cent amounts (zero-sum subsets are rare);
+"round" balances are multiples of 5.00, as when people split round bills,
+which is where the optimal solver saves transfers.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.settlement import greedy, optimal
+
+
+def make_balances(rng, size, kind):
+    if kind == "round":
+        values = [rng.choice([-4, -3, -2, -1, 1, 2, 3, 4]) * 500 for _ in range(size - 1)]
+    else:
+        values = [rng.randint(-50_000, 50_000) for _ in range(size - 1)]
+    values.append(-sum(values))
+    return [(f"person_{i:02d}", value) for i, value in enumerate(values)]
+
+
+def measure(solver, balances):
+    start = time.perf_counter()
+    transfers = solver(balances)
+    return len(transfers), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 15, 20, 25])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'kind':>6} {'size':>4} | {'greedy tx':>9} {'optimal tx':>10} | {'greedy ms':>9} {'optimal ms':>10} {'max ms':>8}")
+    for kind in ["random", "round"]:
+        for size in args.sizes:
+            greedy_counts, optimal_counts, greedy_times, optimal_times = [], [], [], []
+            for _ in range(args.trials):
+                balances = make_balances(rng, size, kind)
+                count, elapsed = measure(greedy, balances)
+                greedy_counts.append(count)
+                greedy_times.append(elapsed)
+                count, elapsed = measure(optimal, balances)
+                optimal_counts.append(count)
+                optimal_times.append(elapsed)
+            print(
+                f"{kind:>6} {size:>4} | "
+                f"{statistics.mean(greedy_counts):9.2f} {statistics.mean(optimal_counts):10.2f} | "
+                f"{statistics.median(greedy_times) * 1000:9.3f} {statistics.median(optimal_times) * 1000:10.3f} "
+                f"{max(optimal_times) * 1000:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
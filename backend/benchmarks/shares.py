@@ -0,0 +1,116 @@
+"""Benchmark the share engine: computing splits and answering balances.
+
+    python -m benchmarks.shares --expenses 100000 --participants 50
+
+Times compute_shares per split type, then seeds split expenses and
+compares the full GROUP BY over `expense_shares` with the ledger read
+that /api/balances actually does.
+"""
+import argparse
+import random
+import uuid
+
+from app.crud import (
+    aggregate_ledger, balance_cents_from_totals, ensure_default_group, get_balance_cents, rebuild_ledger
+)
+from app.models import Expense, ExpenseShare, DEFAULT_GROUP_ID
+from app.splits import SPLIT_TYPES, compute_shares
+
+from .common import reset_database, session, timed
+
+
+def participants_for(split_type, people, amount_cents, rng):
+    """(person, value) pairs that form a valid split of ``amount_cents``"""
+    if split_type == "equal":
+        return [(person, None) for person in people]
+    if split_type == "weight":
+        return [(person, rng.randint(1, 5)) for person in people]
+    if split_type == "percentage":
+        cents = compute_shares(10_000, "weight", [(p, rng.randint(1, 5)) for p in people])
+    else:
+        cents = compute_shares(amount_cents, "weight", [(p, rng.randint(1, 5)) for p in people])
+    return [(person, c / 100) for person, c in cents]
+
+
+def seed_split_expenses(db, num_expenses, num_people, num_participants, seed=42, batch_size=2000):
+    """Insert split expenses (cycling through the split types) into the default group"""
+    ensure_default_group(db)
+    rng = random.Random(seed)
+    people = [f"person_{i:03d}" for i in range(num_people)]
+    expenses, shares = [], []
+    for i in range(num_expenses):
+        expense_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        amount_cents = rng.randint(100, 500_000)
+        split_type = SPLIT_TYPES[i % len(SPLIT_TYPES)]
+        participants = participants_for(split_type, rng.sample(people, num_participants), amount_cents, rng)
+        expenses.append({
+            "id": expense_id,
+            "group_id": DEFAULT_GROUP_ID,
+            "amount_cents": amount_cents,
+            "description": f"expense {i}",
+            "paid_by": rng.choice(people),
+            "split_type": split_type,
+        })
+        values = dict(participants)
+        shares.extend(
+            {"expense_id": expense_id, "group_id": DEFAULT_GROUP_ID, "person": person,
+             "amount_cents": cents, "value": values[person]}
+            for person, cents in compute_shares(amount_cents, split_type, participants)
+        )
+        if len(expenses) >= batch_size:
+            db.bulk_insert_mappings(Expense, expenses)
+            db.bulk_insert_mappings(ExpenseShare, shares)
+            expenses, shares = [], []
+    if expenses:
+        db.bulk_insert_mappings(Expense, expenses)
+        db.bulk_insert_mappings(ExpenseShare, shares)
+    db.commit()
+    rebuild_ledger(db)
+
+
+def aggregate_balance_cents(db):
+    """Balances straight from the GROUP BYs over `expenses` and `expense_shares`"""
+    totals = aggregate_ledger(db, DEFAULT_GROUP_ID)
+    return balance_cents_from_totals([
+        (person, paid, owed) for (_, person), (paid, _, owed, _) in sorted(totals.items())
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--people", type=int, default=100)
+    parser.add_argument("--participants", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    people = [f"person_{i:03d}" for i in range(args.participants)]
+    print(f"compute_shares, {args.participants} participants")
+    for split_type in SPLIT_TYPES:
+        participants = participants_for(split_type, people, 123_456, rng)
+        seconds, _ = timed(
+            lambda: [compute_shares(123_456, split_type, participants) for _ in range(1000)],
+            args.repeat
+        )
+        print(f"  {split_type:<10} : {seconds * 1000:9.3f} µs/expense")
+
+    reset_database()
+    db = session()
+    try:
+        seed_split_expenses(db, args.expenses, args.people, args.participants)
+
+        aggregate_time, expected = timed(lambda: aggregate_balance_cents(db), args.repeat)
+        ledger_time, balances = timed(lambda: get_balance_cents(db, DEFAULT_GROUP_ID), args.repeat)
+        assert balances == expected
+        assert sum(paid - owed for _, paid, owed in balances) == 0
+
+        print(f"expenses={args.expenses} shares={args.expenses * args.participants}")
+        print(f"  GROUP BY   : {aggregate_time * 1000:9.2f} ms")
+        print(f"  ledger     : {ledger_time * 1000:9.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Initial schema: expenses with float amounts and the person_balances ledger
+
+Databases created earlier by ``Base.metadata.create_all`` already have
+this schema; mark them with ``alembic stamp 0001`` before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "expenses",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("paid_by", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_expenses_id", "expenses", ["id"])
+    op.create_index("ix_expenses_paid_by", "expenses", ["paid_by"])
+    op.create_index("idx_expenses_paid_by", "expenses", ["paid_by"])
+    op.create_index("idx_expenses_created_at", "expenses", ["created_at"])
+
+    op.create_table(
+        "person_balances",
+        sa.Column("person", sa.String(), primary_key=True),
+        sa.Column("total_paid", sa.Float(), nullable=False),
+        sa.Column("expense_count", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("person_balances")
+    op.drop_table("expenses")
@@ -0,0 +1,41 @@
+"""Store money as integer cents
+
+Converts ``expenses.amount`` and ``person_balances.total_paid`` from
+floats to BIGINT cents, rounding existing values half away from zero.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (table, float column, cents column)
+CONVERSIONS = [
+    ("expenses", "amount", "amount_cents"),
+    ("person_balances", "total_paid", "total_paid_cents"),
+]
+
+
+def upgrade():
+    for table, float_column, cents_column in CONVERSIONS:
+        op.add_column(table, sa.Column(cents_column, sa.BigInteger(), nullable=True))
+        op.execute(f"UPDATE {table} SET {cents_column} = ROUND(CAST({float_column} AS NUMERIC) * 100)")
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(cents_column, nullable=False)
+            batch.drop_column(float_column)
+
+
+def downgrade():
+    for table, float_column, cents_column in CONVERSIONS:
+        op.add_column(table, sa.Column(float_column, sa.Float(), nullable=True))
+        op.execute(f"UPDATE {table} SET {float_column} = {cents_column} / 100.0")
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(float_column, nullable=False)
+            batch.drop_column(cents_column)
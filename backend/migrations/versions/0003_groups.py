@@ -0,0 +1,79 @@
+"""Multi-tenant groups
+
+Adds the ``groups`` table, scopes ``expenses`` and ``person_balances`` to a
+group and moves every existing row into the ``default`` group. The
+ledger is derived data, so it is recreated with the new key and refilled
+from ``expenses``.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def create_ledger(scoped):
+    """Create person_balances, with or without group scoping, and fill it"""
+    group_columns = []
+    if scoped:
+        group_columns = [
+            sa.Column(
+                "group_id", sa.String(),
+                sa.ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True
+            )
+        ]
+    op.create_table(
+        "person_balances",
+        *group_columns,
+        sa.Column("person", sa.String(), primary_key=True),
+        sa.Column("total_paid_cents", sa.BigInteger(), nullable=False),
+        sa.Column("expense_count", sa.Integer(), nullable=False),
+    )
+    keys = "group_id, paid_by" if scoped else "paid_by"
+    op.execute(
+        f"INSERT INTO person_balances ({keys.replace('paid_by', 'person')}, total_paid_cents, expense_count) "
+        f"SELECT {keys}, SUM(amount_cents), COUNT(id) FROM expenses GROUP BY {keys}"
+    )
+
+
+def upgrade():
+    op.create_table(
+        "groups",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute("INSERT INTO groups (id, name) VALUES ('default', 'Default')")
+
+    with op.batch_alter_table("expenses") as batch:
+        batch.add_column(sa.Column("group_id", sa.String(), nullable=False, server_default="default"))
+    with op.batch_alter_table("expenses") as batch:
+        batch.alter_column("group_id", server_default=None)
+        batch.create_foreign_key(
+            "fk_expenses_group_id", "groups", ["group_id"], ["id"], ondelete="CASCADE"
+        )
+        batch.create_index("idx_expenses_group_created_at", ["group_id", "created_at"])
+        batch.create_index("idx_expenses_group_paid_by", ["group_id", "paid_by"])
+
+    op.drop_table("person_balances")
+    create_ledger(scoped=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM person_balances WHERE group_id <> 'default'")
+    op.execute("DELETE FROM expenses WHERE group_id <> 'default'")
+    op.drop_table("person_balances")
+    with op.batch_alter_table("expenses") as batch:
+        batch.drop_index("idx_expenses_group_paid_by")
+        batch.drop_index("idx_expenses_group_created_at")
+        batch.drop_constraint("fk_expenses_group_id", type_="foreignkey")
+        batch.drop_column("group_id")
+    op.drop_table("groups")
+    create_ledger(scoped=False)
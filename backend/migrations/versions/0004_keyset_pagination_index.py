@@ -0,0 +1,23 @@
+"""Add id to the (group_id, created_at) index for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index("idx_expenses_group_created_at", table_name="expenses")
+    op.create_index("idx_expenses_group_created_at", "expenses", ["group_id", "created_at", "id"])
+
+
+def downgrade():
+    op.drop_index("idx_expenses_group_created_at", table_name="expenses")
+    op.create_index("idx_expenses_group_created_at", "expenses", ["group_id", "created_at"])
@@ -0,0 +1,54 @@
+"""Unequal splits: expense_shares and owed totals in the ledger
+
+Existing expenses have no split and stay shared evenly by the whole group,
+so the new ledger columns start at zero and no data is moved.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("expenses", sa.Column("split_type", sa.String(16), nullable=True))
+    op.create_table(
+        "expense_shares",
+        sa.Column(
+            "expense_id", sa.String(),
+            sa.ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("person", sa.String(), primary_key=True),
+        sa.Column(
+            "group_id", sa.String(),
+            sa.ForeignKey("groups.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("amount_cents", sa.BigInteger(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=True),
+    )
+    op.create_index("idx_expense_shares_group_person", "expense_shares", ["group_id", "person"])
+    op.add_column(
+        "person_balances",
+        sa.Column("owed_cents", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "person_balances",
+        sa.Column("share_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("person_balances") as batch:
+        batch.drop_column("share_count")
+        batch.drop_column("owed_cents")
+    op.drop_index("idx_expense_shares_group_person", table_name="expense_shares")
+    op.drop_table("expense_shares")
+    with op.batch_alter_table("expenses") as batch:
+        batch.drop_column("split_type")
@@ -0,0 +1,60 @@
+"""Store expense ids in native UUID columns
+
+Existing ids are uuid4 strings and convert as they are; new ids are
+time-ordered UUIDv7 values generated by the app. Postgres gets a native
+``uuid`` column (16 bytes instead of a 36-character string). SQLite has
+no UUID type, so SQLAlchemy stores the 32-digit hex form and existing
+values are rewritten to match.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs holding an expense id
+ID_COLUMNS = [("expenses", "id"), ("expense_shares", "expense_id")]
+SHARES_FK = "expense_shares_expense_id_fkey"
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint(SHARES_FK, "expense_shares", type_="foreignkey")
+        for table, column in ID_COLUMNS:
+            op.alter_column(table, column, type_=sa.Uuid(), postgresql_using=f"{column}::uuid")
+        op.create_foreign_key(
+            SHARES_FK, "expense_shares", "expenses", ["expense_id"], ["id"], ondelete="CASCADE"
+        )
+        return
+
+    for table, column in ID_COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = lower(replace({column}, '-', ''))")
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, type_=sa.Uuid(), existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint(SHARES_FK, "expense_shares", type_="foreignkey")
+        for table, column in ID_COLUMNS:
+            op.alter_column(table, column, type_=sa.String(), postgresql_using=f"{column}::text")
+        op.create_foreign_key(
+            SHARES_FK, "expense_shares", "expenses", ["expense_id"], ["id"], ondelete="CASCADE"
+        )
+        return
+
+    for table, column in ID_COLUMNS:
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, type_=sa.String(), existing_nullable=False)
+        op.execute(
+            f"UPDATE {table} SET {column} = substr({column}, 1, 8) || '-' || substr({column}, 9, 4)"
+            f" || '-' || substr({column}, 13, 4) || '-' || substr({column}, 17, 4)"
+            f" || '-' || substr({column}, 21)"
+        )
@@ -0,0 +1,74 @@
+"""Indexes for filtered expense listings; drop the duplicate paid_by indexes
+
+``ix_expenses_paid_by`` and ``idx_expenses_paid_by`` were the same
+single-column index twice, and every read is scoped to a group anyway.
+The (group_id, paid_by) index grows created_at and id so one payer's
+expenses page in order, an amount index serves range filters, and
+descriptions get a full-text index: GIN over a tsvector on Postgres, an
+external-content FTS5 index kept in step by rowid-keyed triggers on
+SQLite (see app/search.py).
+
+SQLite drops triggers with their table, so a later batch migration that
+recreates ``expenses`` has to recreate them.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE expenses_fts USING fts5("
+    "description, content='expenses', content_rowid='rowid')",
+    "CREATE TRIGGER expenses_fts_insert AFTER INSERT ON expenses BEGIN"
+    " INSERT INTO expenses_fts (rowid, description) VALUES (NEW.rowid, NEW.description); END",
+    "CREATE TRIGGER expenses_fts_update AFTER UPDATE OF description ON expenses BEGIN"
+    " INSERT INTO expenses_fts (expenses_fts, rowid, description) VALUES ('delete', OLD.rowid, OLD.description);"
+    " INSERT INTO expenses_fts (rowid, description) VALUES (NEW.rowid, NEW.description); END",
+    "CREATE TRIGGER expenses_fts_delete AFTER DELETE ON expenses BEGIN"
+    " INSERT INTO expenses_fts (expenses_fts, rowid, description) VALUES ('delete', OLD.rowid, OLD.description); END",
+    # Index the existing rows
+    "INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    op.drop_index("ix_expenses_paid_by", table_name="expenses")
+    op.drop_index("idx_expenses_paid_by", table_name="expenses")
+    op.drop_index("idx_expenses_group_paid_by", table_name="expenses")
+    op.create_index(
+        "idx_expenses_group_paid_by", "expenses", ["group_id", "paid_by", "created_at", "id"]
+    )
+    op.create_index("idx_expenses_group_amount", "expenses", ["group_id", "amount_cents"])
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE INDEX idx_expenses_description_fts ON expenses"
+            " USING gin (to_tsvector('simple', description))"
+        )
+    elif dialect == "sqlite":
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX idx_expenses_description_fts")
+    elif dialect == "sqlite":
+        for trigger in ("expenses_fts_insert", "expenses_fts_update", "expenses_fts_delete"):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE expenses_fts")
+
+    op.drop_index("idx_expenses_group_amount", table_name="expenses")
+    op.drop_index("idx_expenses_group_paid_by", table_name="expenses")
+    op.create_index("idx_expenses_group_paid_by", "expenses", ["group_id", "paid_by"])
+    op.create_index("idx_expenses_paid_by", "expenses", ["paid_by"])
+    op.create_index("ix_expenses_paid_by", "expenses", ["paid_by"])
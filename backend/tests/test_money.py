@@ -0,0 +1,75 @@
+"""Properties of the remainder distribution in money.py and splits.py.
+
+Cases are drawn from a seeded RNG, so every run checks the same inputs:
+
+    cd backend && python -m pytest tests
+"""
+import random
+from decimal import Decimal
+
+import pytest
+
+from app.money import allocate, split_evenly
+from app.splits import compute_shares
+
+SEEDS = range(20)
+CASES_PER_SEED = 200
+
+def random_cases(seed):
+    rng = random.Random(seed)
+    for _ in range(CASES_PER_SEED):
+        total_cents = rng.choice([0, 1, rng.randint(1, 99), rng.randint(1, 10**11)])
+        count = rng.randint(1, 50)
+        yield rng, total_cents, count
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_split_evenly_adds_up_and_differs_by_at_most_a_cent(seed):
+    for _, total_cents, count in random_cases(seed):
+        shares = split_evenly(total_cents, count)
+        assert len(shares) == count
+        assert sum(shares) == total_cents
+        assert max(shares) - min(shares) <= 1
+        # Leftover cents go to the first shares
+        assert shares == sorted(shares, reverse=True)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_allocate_adds_up_and_stays_within_a_cent_of_exact(seed):
+    for rng, total_cents, count in random_cases(seed):
+        weights = [Decimal(rng.randint(0, 1000)) / rng.choice([1, 10, 100]) for _ in range(count)]
+        if not any(weights):
+            weights[0] = Decimal(1)
+        shares = allocate(total_cents, weights)
+        assert sum(shares) == total_cents
+        for share, weight in zip(shares, weights):
+            exact = total_cents * weight / sum(weights)
+            assert abs(share - exact) < 1
+            assert share >= 0
+
+@pytest.mark.parametrize("split_type", ["equal", "percentage", "weight"])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_compute_shares_adds_up_and_is_deterministic(split_type, seed):
+    for rng, total_cents, count in random_cases(seed):
+        people = [f"person{i}" for i in range(count)]
+        if split_type == "equal":
+            values = [None] * count
+        elif split_type == "percentage":
+            # Whole-cent percentages that add up to exactly 100
+            cuts = sorted(rng.randint(0, 10_000) for _ in range(count - 1))
+            values = [(b - a) / 100 for a, b in zip([0] + cuts, cuts + [10_000])]
+        else:
+            values = [rng.randint(1, 1000) / 10 for _ in range(count)]
+        participants = list(zip(people, values))
+        
+        shares = compute_shares(total_cents, split_type, participants)
+        assert [person for person, _ in shares] == people
+        assert sum(cents for _, cents in shares) == total_cents
+        assert compute_shares(total_cents, split_type, participants) == shares
+        if split_type == "equal":
+            amounts = [cents for _, cents in shares]
+            assert max(amounts) - min(amounts) <= 1
+
+def test_remainders_go_to_the_largest_fractions_first():
+    assert split_evenly(100, 3) == [34, 33, 33]
+    assert allocate(100, [Decimal(1), Decimal(1), Decimal(1)]) == [34, 33, 33]
+    # 10 * 2/3 = 6.67 and 10 * 1/3 = 3.33: the bigger fraction gets the cent
+    assert allocate(10, [Decimal(2), Decimal(1)]) == [7, 3]
@@ -92,9 +92,9 @@ async function deleteExpense(expenseId) {
     try {
         await apiCall(`/expenses/${expenseId}`, { method: 'DELETE' });
         showAlert('Expense deleted successfully');
-        loadExpenses();
-        loadBalances();
-        loadSettlements();
+        if (!streamConnected) {
+            await refreshAll();
+        }
     } catch (error) {
         showAlert(`Error deleting expense: ${error.message}`, 'error');
     }
@@ -261,17 +261,102 @@ expenseForm.addEventListener('submit', async (e) => {
         showAlert('Expense added successfully!');
         expenseForm.reset();
         
-        // Reload all data
-        await Promise.all([
-            loadExpenses(),
-            loadBalances(),
-            loadSettlements()
-        ]);
+        // The stream pushes the change; reload only if it is down
+        if (!streamConnected) {
+            await refreshAll();
+        }
     } catch (error) {
         showAlert(`Error adding expense: ${error.message}`, 'error');
     }
 });
 
+// Live Updates
+// The server pushes balances, settlements and the expense delta whenever the
+// ledger changes; polling only runs while the stream is unavailable.
+const POLL_INTERVAL_MS = 30000;
+let pollTimer = null;
+let streamConnected = false;
+
+// One round trip for everything on screen, read from a single snapshot
+async function refreshAll() {
+    const response = await apiCall('/dashboard');
+    currentExpenses = response.data.expenses;
+    currentBalances = response.data.balances;
+    currentSettlements = response.data.settlements;
+    renderExpenses();
+    renderBalances();
+    renderSettlements();
+    updateStats();
+}
+
+function startPolling() {
+    if (pollTimer) {
+        return;
+    }
+    pollTimer = setInterval(async () => {
+        try {
+            await refreshAll();
+        } catch (error) {
+            console.warn('Auto-refresh failed:', error);
+        }
+    }, POLL_INTERVAL_MS);
+}
+
+function stopPolling() {
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
+function applyExpenseDelta(delta) {
+    const expense = delta.expense;
+    if (delta.op === 'created') {
+        if (!currentExpenses.some(exp => exp.id === expense.id)) {
+            currentExpenses.unshift(expense);
+        }
+    } else if (delta.op === 'updated') {
+        currentExpenses = currentExpenses.map(exp => exp.id === expense.id ? expense : exp);
+    } else if (delta.op === 'deleted') {
+        currentExpenses = currentExpenses.filter(exp => exp.id !== expense.id);
+    }
+    renderExpenses();
+}
+
+function applyLedgerEvent(payload) {
+    currentBalances = payload.balances;
+    currentSettlements = payload.settlements;
+    renderBalances();
+    renderSettlements();
+
+    if (payload.delta && payload.delta.expense) {
+        applyExpenseDelta(payload.delta);
+        updateStats();
+    } else {
+        // Initial snapshot, bulk import or a change made elsewhere
+        loadExpenses();
+    }
+}
+
+function connectStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/stream`);
+    source.addEventListener('ledger', (event) => {
+        applyLedgerEvent(JSON.parse(event.data));
+    });
+    source.onopen = () => {
+        streamConnected = true;
+        stopPolling();
+    };
+    source.onerror = () => {
+        // EventSource reconnects on its own; poll until it does
+        streamConnected = false;
+        startPolling();
+    };
+}
+
 // Initialize the app
 async function initApp() {
     try {
@@ -280,28 +365,13 @@ async function initApp() {
         showAlert('Connected to Split App API successfully!');
         
         // Load initial data
-        await Promise.all([
-            loadExpenses(),
-            loadBalances(),
-            loadSettlements()
-        ]);
+        await refreshAll();
     } catch (error) {
         showAlert(`Failed to connect to API: ${error.message}. Please check if the backend is running.`, 'error');
     }
+
+    connectStream();
 }
 
 // Start the app when page loads
 document.addEventListener('DOMContentLoaded', initApp);
-
-// Auto-refresh data every 30 seconds
-setInterval(async () => {
-    try {
-        await Promise.all([
-            loadExpenses(),
-            loadBalances(),
-            loadSettlements()
-        ]);
-    } catch (error) {
-        console.warn('Auto-refresh failed:', error);
-    }
-}, 30000);
\ No newline at end of file
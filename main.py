@@ -1,11 +1,16 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, validator
 from typing import List, Optional, Dict
 from decimal import Decimal, ROUND_HALF_UP
+import asyncio
+import json
+import os
 import uuid
 from datetime import datetime
-from collections import defaultdict
+
+from store import make_store
 
 app = FastAPI(
     title="Split App Backend",
@@ -22,9 +27,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory storage (replace with database in production)
-expenses_db = {}
-people_db = set()
+# In-memory by default; STORE_URL=sqlite:///path.db keeps data across restarts
+store = make_store(os.getenv("STORE_URL", "memory"))
+
+# DEBUG_TOTALS=1 serves GET /debug/totals, a full recompute of the totals
+DEBUG_TOTALS = os.getenv("DEBUG_TOTALS", "0") == "1"
+
+# GET /stream subscribers, each a queue of change counters; the page
+# reloads when one arrives instead of polling
+KEEPALIVE_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 16
+subscribers = set()
+change_count = 0
 
 # Pydantic models
 class ExpenseCreate(BaseModel):
@@ -104,19 +118,16 @@ def calculate_per_person_share(total_amount: float, num_people: int) -> float:
 
 def get_balances() -> List[Balance]:
     """Calculate balances for all people"""
-    if not expenses_db:
-        return []
+    # Running totals kept by the store: O(people), no pass over expenses
+    paid_cents, total_cents = store.totals()
     
     # Calculate total paid by each person
-    total_paid = defaultdict(float)
-    total_expenses = 0
-    
-    for expense in expenses_db.values():
-        total_paid[expense['paid_by']] += expense['amount']
-        total_expenses += expense['amount']
+    total_paid = {person: cents / 100 for person, cents in paid_cents.items()}
+    total_expenses = total_cents / 100
     
     # Calculate fair share per person
-    num_people = len(people_db)
+    people = sorted(total_paid)
+    num_people = len(people)
     if num_people == 0:
         return []
     
@@ -124,7 +135,7 @@ def get_balances() -> List[Balance]:
     
     # Calculate balances
     balances = []
-    for person in people_db:
+    for person in people:
         paid = total_paid.get(person, 0.0)
         balance = paid - fair_share
         balances.append(Balance(
@@ -136,6 +147,16 @@ def get_balances() -> List[Balance]:
     
     return balances
 
+def publish_change():
+    """Tell every stream subscriber that the expenses changed"""
+    global change_count
+    change_count += 1
+    for queue in subscribers:
+        # A slow client only needs the latest counter
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(change_count)
+
 def calculate_settlements() -> List[Settlement]:
     """Calculate optimized settlements to minimize transactions"""
     balances = get_balances()
@@ -196,9 +217,6 @@ async def add_expense(expense: ExpenseCreate):
         expense_id = str(uuid.uuid4())
         now = datetime.utcnow()
         
-        # Add person to people_db
-        people_db.add(expense.paid_by)
-        
         # Create expense
         new_expense = {
             "id": expense_id,
@@ -209,7 +227,8 @@ async def add_expense(expense: ExpenseCreate):
             "updated_at": now.isoformat()
         }
         
-        expenses_db[expense_id] = new_expense
+        store.add(new_expense)
+        publish_change()
         
         return APIResponse(
             success=True,
@@ -223,9 +242,8 @@ async def add_expense(expense: ExpenseCreate):
 
 @app.get("/expenses", response_model=APIResponse)
 async def get_expenses():
-    expenses_list = list(expenses_db.values())
-    # Sort by created_at descending
-    expenses_list.sort(key=lambda x: x['created_at'], reverse=True)
+    # Already newest first
+    expenses_list = store.list_expenses()
     
     return APIResponse(
         success=True,
@@ -235,40 +253,25 @@ async def get_expenses():
 
 @app.put("/expenses/{expense_id}", response_model=APIResponse)
 async def update_expense(expense_id: str, expense_update: ExpenseUpdate):
-    if expense_id not in expenses_db:
+    if store.get(expense_id) is None:
         raise HTTPException(status_code=404, detail="Expense not found")
     
     try:
-        expense = expenses_db[expense_id].copy()
-        
-        # Update fields if provided
-        if expense_update.amount is not None:
-            expense['amount'] = expense_update.amount
-        if expense_update.description is not None:
-            expense['description'] = expense_update.description
-        if expense_update.paid_by is not None:
-            # Remove old person if no other expenses
-            old_paid_by = expense['paid_by']
-            expense['paid_by'] = expense_update.paid_by
-            people_db.add(expense_update.paid_by)
-            
-            # Check if old person should be removed
-            if old_paid_by != expense_update.paid_by:
-                has_other_expenses = any(
-                    exp['paid_by'] == old_paid_by and exp['id'] != expense_id
-                    for exp in expenses_db.values()
-                )
-                if not has_other_expenses:
-                    people_db.discard(old_paid_by)
-        
-        expense['updated_at'] = datetime.utcnow().isoformat()
-        expenses_db[expense_id] = expense
+        # Update fields if provided; the store keeps the people list in step
+        changes = expense_update.model_dump(exclude_none=True)
+        changes['updated_at'] = datetime.utcnow().isoformat()
+        expense = store.update(expense_id, changes)
+        if expense is None:
+            raise HTTPException(status_code=404, detail="Expense not found")
+        publish_change()
         
         return APIResponse(
             success=True,
             data=expense,
             message="Expense updated successfully"
         )
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -276,31 +279,22 @@ async def update_expense(expense_id: str, expense_update: ExpenseUpdate):
 
 @app.delete("/expenses/{expense_id}", response_model=APIResponse)
 async def delete_expense(expense_id: str):
-    if expense_id not in expenses_db:
-        raise HTTPException(status_code=404, detail="Expense not found")
-    
     try:
-        expense = expenses_db[expense_id]
-        paid_by = expense['paid_by']
-        
-        # Delete expense
-        del expenses_db[expense_id]
-        
-        # Check if person should be removed
-        has_other_expenses = any(exp['paid_by'] == paid_by for exp in expenses_db.values())
-        if not has_other_expenses:
-            people_db.discard(paid_by)
-        
-        return APIResponse(
-            success=True,
-            message="Expense deleted successfully"
-        )
+        deleted = store.delete(expense_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    publish_change()
+    
+    return APIResponse(
+        success=True,
+        message="Expense deleted successfully"
+    )
 
 @app.get("/people", response_model=APIResponse)
 async def get_people():
-    people_list = sorted(list(people_db))
+    people_list = store.people()
     return APIResponse(
         success=True,
         data={"people": people_list, "count": len(people_list)},
@@ -325,9 +319,64 @@ async def get_settlements():
         message="Settlements calculated successfully"
     )
 
+@app.get("/stream", response_class=StreamingResponse)
+async def stream_changes(request: Request):
+    """Server-Sent Events: a `ledger` event on connect and after every expense write"""
+    async def events():
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        subscribers.add(queue)
+        try:
+            version = change_count
+            while True:
+                yield f"event: ledger\nid: {version}\ndata: {json.dumps({'version': version})}\n\n"
+                while True:
+                    if await request.is_disconnected():
+                        return
+                    try:
+                        version = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+        finally:
+            subscribers.discard(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def verify_totals():
+    """Compare the store's running totals with a full recompute over every expense"""
+    paid_cents, total_cents = store.totals()
+    expected_paid, expected_total = store.recompute_totals()
+    mismatches = [
+        {"person": person, "running": paid_cents.get(person), "recomputed": expected_paid.get(person)}
+        for person in sorted(paid_cents.keys() | expected_paid.keys())
+        if paid_cents.get(person) != expected_paid.get(person)
+    ]
+    consistent = not mismatches and total_cents == expected_total
+    return APIResponse(
+        success=consistent,
+        data={
+            "total_cents": total_cents,
+            "recomputed_total_cents": expected_total,
+            "mismatches": mismatches
+        },
+        message="Running totals match" if consistent else "Running totals have drifted"
+    )
+
+# The check reads every expense, so it is only served when asked for
+if DEBUG_TOTALS:
+    app.add_api_route("/debug/totals", verify_totals, methods=["GET"], response_model=APIResponse)
+
 # Initialize with sample data
 @app.on_event("startup")
 async def startup_event():
+    # A persistent store keeps its data; only seed an empty one
+    if not store.is_empty():
+        return
+    
     # Add sample expenses for testing
     sample_expenses = [
         {"amount": 600.0, "description": "Dinner at restaurant", "paid_by": "Shantanu"},
@@ -341,16 +390,14 @@ async def startup_event():
         expense_id = str(uuid.uuid4())
         now = datetime.utcnow()
         
-        people_db.add(expense_data["paid_by"])
-        
-        expenses_db[expense_id] = {
+        store.add({
             "id": expense_id,
             "amount": expense_data["amount"],
             "description": expense_data["description"],
             "paid_by": expense_data["paid_by"],
             "created_at": now.isoformat(),
             "updated_at": now.isoformat()
-        }
+        })
 
 if __name__ == "__main__":
     import uvicorn
@@ -107,7 +107,7 @@ done
 # Wait for backend to be ready
 echo "Waiting for backend..."
 for i in {1..30}; do
-    if curl -s http://localhost:8000/health > /dev/null 2>&1; then
+    if curl -sf http://localhost:8000/ready > /dev/null 2>&1; then
         echo -e "${GREEN}✅ Backend is ready!${NC}"
         break
     fi
@@ -0,0 +1,232 @@
+"""Expense storage for the standalone server in main.py.
+
+STORE_URL picks the backend:
+
+- ``memory`` (default): dicts in this process, lost on restart
+- ``sqlite:///path/to/file.db``: a SQLite database in WAL mode; nothing is
+  loaded at startup, so restarts are instant whatever the size
+
+Both keep a created_at-ordered index (expenses are listed newest first
+without sorting) and, per person, an expense count and a running total
+paid (a person disappears when their last expense does, and balances are
+O(people) without touching individual expenses). Running totals are
+integer cents so they never drift from a recompute.
+"""
+import bisect
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+def to_cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+def recompute_totals(expenses) -> Tuple[Dict[str, int], int]:
+    """Per-person and grand totals in cents, from scratch"""
+    paid_cents = Counter()
+    for expense in expenses:
+        paid_cents[expense["paid_by"]] += to_cents(expense["amount"])
+    return dict(paid_cents), sum(paid_cents.values())
+
+class MemoryStore:
+    def __init__(self):
+        self.expenses: Dict[str, dict] = {}
+        # (created_at, id), oldest first. Finding a position is O(log n), but
+        # list inserts and deletes shift the tail, so they are O(n) memmoves
+        # in general; new expenses sort last, so adds are cheap appends
+        self.order: List[tuple] = []
+        self.people_counts = Counter()
+        self.paid_cents = Counter()
+        self.total_cents = 0
+
+    def __len__(self) -> int:
+        return len(self.expenses)
+
+    def is_empty(self) -> bool:
+        return not self.expenses
+
+    def add(self, expense: dict):
+        self.expenses[expense["id"]] = expense
+        bisect.insort(self.order, (expense["created_at"], expense["id"]))
+        self._retain(expense)
+
+    def get(self, expense_id: str) -> Optional[dict]:
+        return self.expenses.get(expense_id)
+
+    def update(self, expense_id: str, changes: dict) -> Optional[dict]:
+        """Apply `changes` to an expense and return it, or None if it does not exist"""
+        old = self.expenses.get(expense_id)
+        if old is None:
+            return None
+        expense = {**old, **changes}
+        self.expenses[expense_id] = expense
+        self._release(old)
+        self._retain(expense)
+        return expense
+
+    def delete(self, expense_id: str) -> bool:
+        expense = self.expenses.pop(expense_id, None)
+        if expense is None:
+            return False
+        key = (expense["created_at"], expense_id)
+        del self.order[bisect.bisect_left(self.order, key)]
+        self._release(expense)
+        return True
+
+    def list_expenses(self) -> List[dict]:
+        """Every expense, newest first"""
+        return [self.expenses[expense_id] for _, expense_id in reversed(self.order)]
+
+    def people(self) -> List[str]:
+        return sorted(self.people_counts)
+
+    def totals(self) -> Tuple[Dict[str, int], int]:
+        """Running (cents paid per person, grand total in cents)"""
+        return dict(self.paid_cents), self.total_cents
+
+    def recompute_totals(self) -> Tuple[Dict[str, int], int]:
+        return recompute_totals(self.expenses.values())
+
+    def _retain(self, expense: dict):
+        cents = to_cents(expense["amount"])
+        self.people_counts[expense["paid_by"]] += 1
+        self.paid_cents[expense["paid_by"]] += cents
+        self.total_cents += cents
+
+    def _release(self, expense: dict):
+        person = expense["paid_by"]
+        cents = to_cents(expense["amount"])
+        self.total_cents -= cents
+        self.paid_cents[person] -= cents
+        self.people_counts[person] -= 1
+        if self.people_counts[person] <= 0:
+            del self.people_counts[person]
+            del self.paid_cents[person]
+
+class SQLiteStore:
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL: readers never block the writer, and a commit is one append
+        # to the log instead of a rewrite of the changed pages
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS expenses ("
+                " id TEXT PRIMARY KEY, amount REAL NOT NULL, description TEXT NOT NULL,"
+                " paid_by TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_expenses_created_at ON expenses (created_at, id)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS people ("
+                " person TEXT PRIMARY KEY, expense_count INTEGER NOT NULL,"
+                " paid_cents INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(people)")]
+            if "paid_cents" not in columns:
+                # Files written before running totals existed
+                self.conn.execute("ALTER TABLE people ADD COLUMN paid_cents INTEGER NOT NULL DEFAULT 0")
+                self.conn.execute(
+                    "UPDATE people SET paid_cents = (SELECT CAST(round(sum(amount) * 100) AS INTEGER)"
+                    " FROM expenses WHERE paid_by = person)"
+                )
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT count(*) FROM expenses").fetchone()[0]
+
+    def is_empty(self) -> bool:
+        """One index probe, unlike len(), which counts every row"""
+        with self.lock:
+            return self.conn.execute("SELECT NOT EXISTS (SELECT 1 FROM expenses)").fetchone()[0] == 1
+
+    def add(self, expense: dict):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO expenses VALUES (:id, :amount, :description, :paid_by, :created_at, :updated_at)",
+                expense
+            )
+            self._retain(expense)
+
+    def get(self, expense_id: str) -> Optional[dict]:
+        with self.lock:
+            return self._get(expense_id)
+
+    def update(self, expense_id: str, changes: dict) -> Optional[dict]:
+        """Apply `changes` to an expense and return it, or None if it does not exist"""
+        with self.lock, self.conn:
+            old = self._get(expense_id)
+            if old is None:
+                return None
+            expense = {**old, **changes}
+            self.conn.execute(
+                "UPDATE expenses SET amount = :amount, description = :description,"
+                " paid_by = :paid_by, updated_at = :updated_at WHERE id = :id",
+                expense
+            )
+            self._release(old)
+            self._retain(expense)
+            return expense
+
+    def delete(self, expense_id: str) -> bool:
+        with self.lock, self.conn:
+            expense = self._get(expense_id)
+            if expense is None:
+                return False
+            self.conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+            self._release(expense)
+            return True
+
+    def list_expenses(self) -> List[dict]:
+        """Every expense, newest first (read in index order)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM expenses ORDER BY created_at DESC, id DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def people(self) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT person FROM people ORDER BY person")]
+
+    def totals(self) -> Tuple[Dict[str, int], int]:
+        """Running (cents paid per person, grand total in cents)"""
+        with self.lock:
+            paid_cents = dict(self.conn.execute("SELECT person, paid_cents FROM people").fetchall())
+        return paid_cents, sum(paid_cents.values())
+
+    def recompute_totals(self) -> Tuple[Dict[str, int], int]:
+        return recompute_totals(self.list_expenses())
+
+    def _get(self, expense_id: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM expenses WHERE id = ?", (expense_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _retain(self, expense: dict):
+        self.conn.execute(
+            "INSERT INTO people (person, expense_count, paid_cents) VALUES (?, 1, ?)"
+            " ON CONFLICT (person) DO UPDATE SET expense_count = expense_count + 1,"
+            " paid_cents = paid_cents + excluded.paid_cents",
+            (expense["paid_by"], to_cents(expense["amount"]))
+        )
+
+    def _release(self, expense: dict):
+        person = expense["paid_by"]
+        self.conn.execute(
+            "UPDATE people SET expense_count = expense_count - 1, paid_cents = paid_cents - ?"
+            " WHERE person = ?",
+            (to_cents(expense["amount"]), person)
+        )
+        self.conn.execute("DELETE FROM people WHERE person = ? AND expense_count <= 0", (person,))
+
+def make_store(url: str):
+    """Build the store named by a STORE_URL value"""
+    if url == "memory":
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported STORE_URL: {url}")